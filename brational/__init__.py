@@ -4,6 +4,8 @@
 #   Distributed under MIT License
 #
 
-from .brat import brat
+from .brat import brat, factor_cache
+from .disk_cache import disk_cache, set_disk_cache, get_disk_cache
+from .archive import write_archive, open_archive
 
 __version__ = '2.0.1'
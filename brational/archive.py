@@ -0,0 +1,182 @@
+#
+#   Copyright 2024--2025 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Archives of many brats stored in one file. The layout is
+#
+#   b"BRATARCH", version byte (1)
+#   records: the outputs of brat.to_bytes, one after the other
+#   index: varint number of entries, then for each entry its key (varint length
+#       and UTF-8 string), and the offset and length of its record as varints
+#   footer: the offset of the index as 8 bytes little-endian, then b"BRIX"
+#
+# Records are written as they are added, and only the index is held in memory.
+
+import mmap
+from .serialize import write_varint, read_varint, write_string, read_string
+
+MAGIC = b"BRATARCH"
+VERSION = 1
+FOOTER = b"BRIX"
+
+class ArchiveWriter:
+	r"""
+	Writes brats to an archive file one at a time. Use as a context manager or
+	call ``close`` to write the index. If the ``with`` block raises an
+	exception, the records written so far are discarded and the empty file is
+	rejected by ``Archive``.
+
+	- ``filename``: the path of the archive file; an existing file is replaced.
+	"""
+
+	def __init__(self, filename:str):
+		self.filename = str(filename)
+		self._file = open(self.filename, "wb")
+		self._file.write(MAGIC + bytes([VERSION]))
+		self._offset = len(MAGIC) + 1
+		self._index = {}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, *args):
+		if exc_type is None:
+			self.close()
+		elif self._file is not None:
+			self._file.truncate(0)
+			self._file.close()
+			self._file = None
+		return False
+
+	def __len__(self) -> int:
+		return len(self._index)
+
+	def add(self, key:str, B):
+		if not isinstance(key, str):
+			raise TypeError("Keys must be strings.")
+		if key in self._index:
+			raise ValueError(f"Key '{key}' is already in the archive.")
+		if not isinstance(B, bytes):
+			from .brat import brat
+			if not isinstance(B, brat):
+				B = brat(B)
+			B = B.to_bytes()
+		self._file.write(B)
+		self._index[key] = (self._offset, len(B))
+		self._offset += len(B)
+
+	def close(self):
+		if self._file is None:
+			return None
+		out = bytearray()
+		write_varint(out, len(self._index))
+		for key, (offset, length) in self._index.items():
+			write_string(out, key)
+			write_varint(out, offset)
+			write_varint(out, length)
+		out += self._offset.to_bytes(8, "little") + FOOTER
+		self._file.write(out)
+		self._file.close()
+		self._file = None
+
+class Archive:
+	r"""
+	Reads an archive file written by ``ArchiveWriter`` or ``write_archive``. The
+	file is memory-mapped and each brat is only decoded when it is accessed.
+	Keys are kept in the order they were written.
+
+	- ``filename``: the path of the archive file.
+	"""
+
+	def __init__(self, filename:str):
+		self.filename = str(filename)
+		self._file = open(self.filename, "rb")
+		self._map = None
+		try:
+			self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+		except ValueError:
+			# Empty files cannot be mapped.
+			self.close()
+			raise ValueError("File is not a brat archive.")
+		n = len(MAGIC)
+		if self._map[:n] != MAGIC or self._map[-len(FOOTER):] != FOOTER:
+			self.close()
+			raise ValueError("File is not a brat archive.")
+		if self._map[n] != VERSION:
+			self.close()
+			raise ValueError(f"Unsupported version {self._map[n]}.")
+		end = len(self._map) - len(FOOTER)
+		pos = int.from_bytes(self._map[end - 8:end], "little")
+		data = memoryview(self._map)
+		count, pos = read_varint(data, pos)
+		self._index = {}
+		for _ in range(count):
+			key, pos = read_string(data, pos)
+			offset, pos = read_varint(data, pos)
+			length, pos = read_varint(data, pos)
+			self._index[key] = (offset, length)
+		data.release()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+		return False
+
+	def __contains__(self, key) -> bool:
+		return key in self._index
+
+	def __getitem__(self, key:str):
+		from .brat import brat
+		return brat.from_bytes(self.get_bytes(key))
+
+	def __iter__(self):
+		return iter(self._index)
+
+	def __len__(self) -> int:
+		return len(self._index)
+
+	def close(self):
+		if self._map is not None:
+			self._map.close()
+			self._map = None
+		if self._file is not None:
+			self._file.close()
+			self._file = None
+
+	def get(self, key:str, default=None):
+		if not key in self._index:
+			return default
+		return self[key]
+
+	def get_bytes(self, key:str) -> bytes:
+		offset, length = self._index[key]
+		return self._map[offset:offset + length]
+
+	def items(self):
+		for key in self._index:
+			yield (key, self[key])
+
+	def keys(self):
+		return self._index.keys()
+
+	def values(self):
+		for key in self._index:
+			yield self[key]
+
+# Given a filename and either a dictionary or an iterable of pairs of keys and
+# brats, write the archive and return the number of entries.
+def write_archive(filename:str, items) -> int:
+	if isinstance(items, dict):
+		items = items.items()
+	with ArchiveWriter(filename) as writer:
+		for key, B in items:
+			writer.add(key, B)
+		return len(writer)
+
+# Given a filename, return the Archive for reading it.
+def open_archive(filename:str) -> Archive:
+	return Archive(filename)
@@ -4,9 +4,25 @@
 #   Distributed under MIT License
 #
 
-from sage.all import ZZ, SR, QQ, PolynomialRing, prod, vector
+import operator
+import pickle
+import re
+import numpy
+from copy import copy
+from io import StringIO
+from itertools import chain
+from sage.all import ZZ, SR, QQ, GF, PolynomialRing, PowerSeriesRing, LaurentSeriesRing, prod, vector, gcd, lcm, Factorization, random_prime
 from sage.all import latex as LaTeX
-from .util import my_print, DEBUG, brat_type, parenthesis_wrap, remove_unnecessary_braces_and_spaces
+from .util import my_print, DEBUG, brat_type, parenthesis_wrap, remove_unnecessary_braces_and_spaces, tree_reduce, LRUCache
+from .disk_cache import get_disk_cache, input_key
+from .serialize import dict_to_bytes, bytes_to_dict
+from .parse import parse_brat
+from .series import univariate_series, multivariate_series
+from .quasipolynomial import QuasiPolynomial
+from .evaluate import horner_scheme, evaluate_scheme, evaluate_denominator, evaluate_arrays, compile_quotient
+
+# Process-wide cache for factorizations and geometric progressions.
+factor_cache = LRUCache()
 
 # Given a polynomial and a dictionary, decide if they represent zero.
 def is_denominator_zero(den, sig) -> bool:
@@ -65,6 +81,16 @@ def is_finite_gp(f):
 		raise RuntimeError("Unexpected behavior. Contact Josh.")
 	return (out, r, len(m))
 
+# Given a polynomial f, return its factorization. Results are stored in the
+# process-wide factor_cache.
+def cached_factor(f):
+	return factor_cache.cached(("factor", f.parent(), f), f.factor)
+
+# Given a polynomial f, return the triple of is_finite_gp. Results are stored in
+# the process-wide factor_cache.
+def cached_finite_gp(f):
+	return factor_cache.cached(("gp", f.parent(), f), lambda: is_finite_gp(f))
+
 # Play games and hope you turn f into an element of P.
 def get_poly(f, P):
 	if f in ZZ:
@@ -110,6 +136,244 @@ def unfold_signature(R, sig, exp_func=lambda _: True):
 	)
 	return monomial*factors
 
+# Given the polynomial ring R and a vector v, return the monomial in R with
+# exponent vector v. The ring QQ is treated as having no variables.
+def vec_to_poly(R, v):
+	if R == QQ:
+		return R.one()
+	return prod((x**e for x, e in zip(R.gens(), v)), R.one())
+
+# Given the polynomial ring R and a polynomial f in R, return the dictionary
+# whose keys are the exponent tuples of f and whose values are the
+# corresponding coefficients.
+def poly_dict(R, f) -> dict:
+	if R == QQ:
+		return {(): f} if f != 0 else {}
+	if len(R.gens()) == 1:
+		return {(e,): c for e, c in R(f).dict().items()}
+	return {tuple(e): c for e, c in R(f).dict().items()}
+
+# Given the polynomial ring R and a dictionary as in poly_dict, return the
+# polynomial in R.
+def dict_poly(R, d:dict):
+	if R == QQ:
+		return d.get((), ZZ(0))
+	if len(R.gens()) == 1:
+		return R({e[0]: c for e, c in d.items()})
+	return R(d)
+
+# Given the polynomial ring R, a vector v, and a positive integer e, return the
+# pair (f, u), where f is a polynomial in R and u is a vector with non-negative
+# entries such that (1 - x^v)^e = f/x^u.
+def binomial_power(R, v, e):
+	neg = [max(-a, 0) for a in v]
+	pos = [max(a, 0) for a in v]
+	f = (vec_to_poly(R, neg) - vec_to_poly(R, pos))**e
+	return (f, tuple(e*a for a in neg))
+
+# Given the polynomial ring R, a numerator N, a coefficient c, a monomial vector
+# m, and a dictionary of factors whose exponents can be any integer, return the
+# numerator and denominator signature in normal form. Factors with negative
+# exponents and negative entries of the monomial are moved to the numerator, and
+# if cancel is True, the common integer content is cancelled.
+def normalize_signature_data(R, N, c, m, factors, cancel:bool=True):
+	m = list(m)
+	sig_factors = {}
+	for v, e in factors.items():
+		if e > 0:
+			sig_factors[v] = e
+		elif e < 0:
+			f, u = binomial_power(R, v, -e)
+			N *= f
+			m = [a + b for a, b in zip(m, u)]
+	N *= vec_to_poly(R, [max(-a, 0) for a in m])
+	m = tuple(max(a, 0) for a in m)
+	if N == 0:
+		return (N, {"coefficient": 1, "monomial": tuple([0]*len(m)), "factors": {}})
+	if c < 0:
+		N, c = -N, -c
+	if R == QQ:
+		N = ZZ(N)
+	if not cancel:
+		return (N, {"coefficient": c, "monomial": m, "factors": sig_factors})
+	g = gcd([c] + list(poly_dict(R, N).values()))
+	if g != 1:
+		N = dict_poly(R, {k: a // g for k, a in poly_dict(R, N).items()})
+		c = c // g
+	return (N, {"coefficient": c, "monomial": m, "factors": sig_factors})
+
+# Given two polynomial rings, return the ring in which both sets of data can be
+# combined. Returns None if there is no such ring.
+def common_ring(R, S):
+	if R == S or S == QQ:
+		return R
+	if R == QQ:
+		return S
+	return None
+
+# Given a brat B and a ring R containing the ring of B, return the numerator and
+# the denominator signature of B over R.
+def data_over_ring(B, R) -> tuple:
+	if R == QQ:
+		return (ZZ(B._n_poly), B._d_sig)
+	if B._ring == R:
+		return (R(B._n_poly), B._d_sig)
+	return (R(B._n_poly), {
+		"coefficient": B._d_sig["coefficient"],
+		"monomial": tuple([0]*len(R.gens())),
+		"factors": {},
+	})
+
+# Given the polynomial ring R, a numerator N, a signature sig, and an integer k,
+# return the numerator and signature of (N/sig)^k, where the factors of the
+# signature can have negative exponents. Returns None if k < 0 and N is not a
+# monomial since then the power is not of this form.
+def signature_power_data(R, N, sig, k:int):
+	if k >= 0:
+		return (N**k, {
+			"coefficient": sig["coefficient"]**k,
+			"monomial": tuple(k*a for a in sig["monomial"]),
+			"factors": {v: k*e for v, e in sig["factors"].items()},
+		})
+	N_dict = poly_dict(R, N)
+	if len(N_dict) != 1:
+		return None
+	(u, c), = N_dict.items()
+	return ((sig["coefficient"]*vec_to_poly(R, sig["monomial"]))**(-k), {
+		"coefficient": c**(-k),
+		"monomial": tuple(-k*a for a in u),
+		"factors": {v: k*e for v, e in sig["factors"].items()},
+	})
+
+# Given two pairs of numerators and signatures, return the pair for their
+# product. The result is not normalized.
+def multiply_data(X:tuple, Y:tuple) -> tuple:
+	(N1, sig1), (N2, sig2) = X, Y
+	factors = {v: e for v, e in sig1["factors"].items()}
+	for v, e in sig2["factors"].items():
+		factors[v] = factors.get(v, 0) + e
+	return (N1*N2, {
+		"coefficient": sig1["coefficient"]*sig2["coefficient"],
+		"monomial": tuple(a + b for a, b in zip(sig1["monomial"], sig2["monomial"])),
+		"factors": factors,
+	})
+
+# Given the polynomial ring R and a list of denominator signatures, return the
+# least common signature. Its coefficient is the lcm of the coefficients, each
+# factor has the maximal exponent among the signatures, and its monomial is the
+# smallest one for which every numerator can be rescaled to a polynomial.
+def common_signature(R, sigs:list) -> dict:
+	factors = {}
+	for sig in sigs:
+		for v, e in sig["factors"].items():
+			if factors.get(v, 0) < e:
+				factors[v] = e
+	m = [0]*len(sigs[0]["monomial"])
+	for sig in sigs:
+		u = list(sig["monomial"])
+		for v, e in factors.items():
+			k = e - sig["factors"].get(v, 0)
+			u = [a + k*max(-b, 0) for a, b in zip(u, v)]
+		m = [max(a, b) for a, b in zip(m, u)]
+	return {
+		"coefficient": lcm([sig["coefficient"] for sig in sigs]),
+		"monomial": tuple(m),
+		"factors": factors,
+	}
+
+# Given the polynomial ring R, a numerator N with signature sig, and a common
+# signature as in common_signature, return the numerator over the common
+# signature.
+def rescale_numerator(R, N, sig:dict, common:dict):
+	N = N*(common["coefficient"] // sig["coefficient"])
+	u = [a - b for a, b in zip(common["monomial"], sig["monomial"])]
+	for v, e in common["factors"].items():
+		k = e - sig["factors"].get(v, 0)
+		if k > 0:
+			f, w = binomial_power(R, v, k)
+			N *= f
+			u = [a - b for a, b in zip(u, w)]
+	return N*vec_to_poly(R, u)
+
+# Given the polynomial ring R and two pairs of numerators and signatures, return
+# the pair for their sum over the least common signature. The result is not
+# normalized.
+def add_data(R, X:tuple, Y:tuple) -> tuple:
+	(N1, sig1), (N2, sig2) = X, Y
+	common = common_signature(R, [sig1, sig2])
+	N = rescale_numerator(R, N1, sig1, common)
+	N += rescale_numerator(R, N2, sig2, common)
+	return (N, common)
+
+# Given the polynomial ring R and a pair of a numerator and a signature, return
+# the corresponding brat after normalizing.
+def build_normalized_brat(R, X:tuple):
+	N, sig = X
+	N, sig = normalize_signature_data(
+		R,
+		N,
+		sig["coefficient"],
+		sig["monomial"],
+		sig["factors"],
+	)
+	return build_brat(R, N, sig)
+
+# Given a list of brats and scalars, return the common polynomial ring together
+# with the list of pairs of numerators and signatures over that ring. Returns
+# None if there is no common ring.
+def common_data(L:list):
+	L = [B if isinstance(B, brat) else brat(B) for B in L]
+	R = L[0]._ring
+	for B in L[1:]:
+		R = common_ring(R, B._ring)
+		if R is None:
+			return None
+	try:
+		return (R, [data_over_ring(B, R) for B in L])
+	except TypeError:
+		return None
+
+# Given a brat A, another object, and k in {1, -1}, return A*B^k computed
+# directly from the denominator signatures, where B is the other object as a
+# brat. Returns None if this is not possible, in which case the caller should
+# fall back to the arithmetic of rational functions.
+def signature_product(A, other, k:int):
+	if not isinstance(other, brat) and not other in QQ:
+		return None
+	data = common_data([A, other])
+	if data is None:
+		return None
+	R, (X, (N2, sig2)) = data
+	Y = signature_power_data(R, N2, sig2, k)
+	if Y is None:
+		return None
+	return build_normalized_brat(R, multiply_data(X, Y))
+
+# Given a brat A, another object, and a sign in {1, -1}, return A + sign*B
+# computed over the least common signature, where B is the other object as a
+# brat. Returns None if this is not possible, in which case the caller should
+# fall back to the arithmetic of rational functions.
+def signature_sum(A, other, sign:int):
+	if not isinstance(other, brat) and not other in QQ:
+		return None
+	data = common_data([A, other])
+	if data is None:
+		return None
+	R, (X, (N2, sig2)) = data
+	return build_normalized_brat(R, add_data(R, X, (sign*N2, sig2)))
+
+# Given a brat B and an integer k, return B^k computed directly from the
+# denominator signature. Returns None if this is not possible.
+def signature_power(B, k:int):
+	data = common_data([B])
+	if data is None:
+		return None
+	R, (X,) = data
+	Y = signature_power_data(R, *X, k)
+	if Y is None:
+		return None
+	return build_normalized_brat(R, Y)
+
 # Given a list of polynomial factors, return the integer factor together with a
 # list of positive degree terms
 def split_integer_factor(factors):
@@ -122,9 +386,89 @@ def split_integer_factor(factors):
 			pos_facts.append((f, e))
 	return (int_coeff, pos_facts)
 
+# Given a nonzero integer vector v, decide if v is the preferred exponent for a
+# factor (1 - x^v). This agrees with is_preferred on monomials.
+def is_preferred_vector(v) -> bool:
+	if all(a >= 0 for a in v):
+		return True
+	if all(a <= 0 for a in v):
+		return False
+	return next(a for a in v if a != 0) < 0
+
+# Given a dictionary of factors {v: e}, return it ordered by total degree, then
+# by the sum of the absolute values of the entries, and then by exponent vector.
+def sort_factors(factors:dict) -> dict:
+	key = lambda v: (sum(v), sum(abs(a) for a in v), v)
+	return {v: factors[v] for v in sorted(factors, key=key)}
+
+# Given the polynomial ring R and a polynomial D, attempt to write D as 
+# 	u*x^m*prod_i (1 - x^(v_i))^(e_i)
+# without factoring. We order exponents lexicographically, so after dividing by
+# the smallest term, the next smallest term is -x^w, where (1 - x^w) is a factor
+# with w minimal. We peel off such factors by exact division. Returns the triple
+# (u, m, factors) or None if D is not of this form. The factors are ordered by
+# total degree and then by exponent vector, so that the order does not depend on
+# the order they are found.
+def peel_binomials(R, D):
+	d = poly_dict(R, D)
+	m0 = min(d)
+	u = d[m0]
+	if any(c % u != 0 for c in d.values()):
+		return None
+	P = D // u
+	d = poly_dict(R, P)
+	m = m0
+	factors = {}
+	while len(d) > 1:
+		w = min(k for k in d if k != m0)
+		if d[w] >= 0:
+			return None
+		w = tuple(a - b for a, b in zip(w, m0))
+		neg = [max(-a, 0) for a in w]
+		pos = [max(a, 0) for a in w]
+		P, r = P.quo_rem(vec_to_poly(R, neg) - vec_to_poly(R, pos))
+		if r != 0:
+			return None
+		m0 = tuple(a - b for a, b in zip(m0, neg))
+		factors[w] = factors.get(w, 0) + 1
+		d = poly_dict(R, P)
+	sig_factors = {}
+	for w, e in factors.items():
+		if is_preferred_vector(w):
+			sig_factors[w] = e
+		else:
+			# (1 - x^w) = -x^w*(1 - x^(-w))
+			sig_factors[tuple(-a for a in w)] = e
+			u *= (-1)**e
+			m = tuple(a + e*b for a, b in zip(m, w))
+	if any(a < 0 for a in m):
+		return None
+	return (u, m, sort_factors(sig_factors))
+
+# Given the polynomial ring R and two lists of elements in the fraction field of
+# R, decide if the products of the lists agree by evaluating them at random
+# points modulo several large primes. Equal products always pass, and unequal
+# products pass with negligible probability.
+def is_equal_modular(R, lhs:list, rhs:list, trials:int=3) -> bool:
+	while trials > 0:
+		F = GF(random_prime(2**62, lbound=2**61))
+		pt = [F.random_element() for _ in R.gens()]
+		ev = lambda g: F(g) if g in ZZ else g.change_ring(F)(*pt)
+		nums = [ev(f.numerator()) for f in lhs + rhs]
+		dens = [ev(f.denominator()) for f in lhs + rhs]
+		if any(d == 0 for d in dens):
+			continue
+		vals = [a/b for a, b in zip(nums, dens)]
+		if prod(vals[:len(lhs)]) != prod(vals[len(lhs):]):
+			return False
+		trials -= 1
+	return True
+
 # Given the polynomial ring R, the numerator N, and the denominator D, construct
-# the denominator signature.
-def get_signature(R, N, D):
+# the denominator signature. The final equality check is determined by verify:
+# "exact" cross-multiplies, "modular" evaluates at random points modulo large
+# primes, and "off" skips it.
+def get_signature(R, N, D, verify:str="exact"):
 	# First rule out the case where D is in the field.
 	if D in R.base_ring():
 		return (N, {
@@ -132,13 +476,21 @@ def get_signature(R, N, D):
 			"monomial": tuple([0]*len(R.gens())),
 			"factors": {},
 		})
+	# Most denominators are products of binomials (1 - M), so try that first.
+	peeled = peel_binomials(R, D)
+	if peeled is not None:
+		u, m, factors = peeled
+		if u < 0:
+			N, u = -N, -u
+		my_print(DEBUG, f"Peeled binomials: {factors}")
+		return (N, {"coefficient": u, "monomial": m, "factors": factors})
 	varbs = R.gens()
 	if len(varbs) == 1: 
 		deg = lambda m: vector(ZZ, [m.degree()])
 	else:
 		deg = lambda m: vector(ZZ, m.degrees())
 	mon = lambda v: prod(x**e for x, e in zip(varbs, v))
-	const, D_factors = split_integer_factor(D.factor())
+	const, D_factors = split_integer_factor(cached_factor(D))
 	gp_factors = {}							# all geometric progressions
 	pos_facts = R(1)						# all factors to go to numerator
 	my_print(DEBUG, f"Numerator:\n\t{N}")
@@ -175,7 +527,7 @@ def get_signature(R, N, D):
 			my_print(DEBUG, f"const: {const}", 2)
 		else:
 			my_print(DEBUG, f"Polynomial: {f} -- is not GP", 1)
-			k, r, n = is_finite_gp(f)
+			k, r, n = cached_finite_gp(f)
 			my_print(DEBUG, f"data: ({k}, {r}, {n})", 2)
 			r_num, r_den = R(r.numerator()), R(r.denominator())
 			const *= k
@@ -200,9 +552,9 @@ def get_signature(R, N, D):
 	my_print(DEBUG, f"Accumulated factors: {pos_facts}", 1)
 	# Clean up the monomial a little bit. 
 	pos_facts_cleaned = R.one()
-	for n_mon, e in list(pos_facts.factor()):
+	for n_mon, e in list(cached_factor(pos_facts)):
 		my_print(DEBUG, f"Polynomial: {n_mon}", 1)
-		k, r, n = is_finite_gp(n_mon)
+		k, r, n = cached_finite_gp(n_mon)
 		my_print(DEBUG, f"data: ({k}, {r}, {n})", 2)
 		r_num, r_den = R(r.numerator()), R(r.denominator())
 		if r_num.monomial_coefficient(r_num.monomials()[0]) > 0:
@@ -226,14 +578,20 @@ def get_signature(R, N, D):
 	D_form = const*unfold_signature(
 		R, {"factors": gp_factors}, lambda e: e > 0
 	)
-	if N_form/D_form != N/D:	# Most important check!
+	if verify == "exact":
+		verified = N_form*D == N*D_form
+	elif verify == "modular":
+		verified = is_equal_modular(R, [N_form, D], [N, D_form])
+	else:
+		verified = True
+	if not verified:	# Most important check!
 		my_print(DEBUG, "ERROR!")
 		my_print(DEBUG, f"Expected:\n\t{N/D}")
 		my_print(DEBUG, f"Numerator:\n\t{N_form}")
 		my_print(DEBUG, f"Denominator:\n\t{D_form}")
 		raise ValueError("Rational function does not satisfy main assumption. For details see:\n\thttps://joshmaglione.com/BRational/brat/")
 	my_print(DEBUG, f"const: {const}", 1)
-	const_unit, const_mono_factors = split_integer_factor(const.factor())
+	const_unit, const_mono_factors = split_integer_factor(cached_factor(const))
 	const_mono = R(prod(f**e for f, e in const_mono_factors))
 	if const_unit < 0:
 		N_form = -N_form
@@ -245,8 +603,68 @@ def get_signature(R, N, D):
 		"factors": gp_factors,
 	})
 
+# Given the polynomial ring R, the numerator N, and the denominator signature
+# sig, determine the brat type.
+def get_brat_type(R, N, sig) -> brat_type:
+	N_const = N in ZZ
+	if sig["factors"] != {}:
+		return brat_type("rf")
+	if list(sig["monomial"]) != [0]*len(sig["monomial"]):
+		if sig["coefficient"] == 1:
+			return brat_type("ilp")
+		return brat_type("rlp")
+	if sig["coefficient"] == 1:
+		return brat_type("i") if N_const else brat_type("ip")
+	return brat_type("r") if N_const else brat_type("rp")
+
+# Given a rational number c, return it as an int, or as a string if c is not an
+# integer.
+def encode_number(c):
+	c = QQ(c)
+	return int(c) if c in ZZ else str(c)
+
+# Given the output of encode_number, return the rational number.
+def decode_number(c):
+	if isinstance(c, int):
+		return ZZ(c)
+	c = QQ(c)
+	return ZZ(c) if c in ZZ else c
+
+# Given the polynomial ring R, the numerator N, the denominator signature sig,
+# and the brat type, return a dictionary of integers, strings, and lists from
+# which the data can be rebuilt with data_from_dict.
+def data_to_dict(R, N, sig:dict, br_type:brat_type) -> dict:
+	return {
+		"variables": None if R == QQ else [str(x) for x in R.gens()],
+		"numerator": [
+			list(k) + [encode_number(c)] for k, c in poly_dict(R, N).items()
+		],
+		"coefficient": encode_number(sig["coefficient"]),
+		"monomial": [int(a) for a in sig["monomial"]],
+		"factors": [
+			[int(a) for a in v] + [int(e)] for v, e in sig["factors"].items()
+		],
+		"type": br_type.value,
+	}
+
+# Given the output of data_to_dict, return the tuple (R, N, sig, br_type).
+def data_from_dict(d:dict) -> tuple:
+	if d["variables"] is None:
+		R = QQ
+	else:
+		R = PolynomialRing(ZZ, d["variables"])
+	N = dict_poly(R, {
+		tuple(t[:-1]): decode_number(t[-1]) for t in d["numerator"]
+	})
+	sig = {
+		"coefficient": decode_number(d["coefficient"]),
+		"monomial": tuple(ZZ(a) for a in d["monomial"]),
+		"factors": {tuple(ZZ(a) for a in t[:-1]): ZZ(t[-1]) for t in d["factors"]},
+	}
+	return (R, N, sig, brat_type(d["type"]))
+
 # Given data, determine the polynomial ring, the numerator and the denominator.
-def process_input(num, dem=None, sig=None, fix=True):
+def process_input(num, dem=None, sig=None, fix=True, verify="exact"):
 	# Normalize
 	if sig and sig["coefficient"] < 0:
 		num *= -1 
@@ -342,7 +760,7 @@ def process_input(num, dem=None, sig=None, fix=True):
 		D_sig = sig
 		N_new = N
 	else:
-		N_new, D_sig = get_signature(R, N, D)
+		N_new, D_sig = get_signature(R, N, D, verify=verify)
 	
 	# Determine the brat type
 	br_type = brat_type("rf")
@@ -365,6 +783,351 @@ def process_input(num, dem=None, sig=None, fix=True):
 	# Celebrate!
 	return (R, N_new, D_sig, br_type)
 
+# Given a list of factors or a Factorization, return the list of pairs (f, e)
+# representing the product of all f^e. Entries of a list can be polynomials or
+# pairs (f, e).
+def denominator_factors(factors) -> list:
+	if isinstance(factors, Factorization):
+		return [(factors.unit(), 1)] + list(factors)
+	return [
+		(F[0], F[1]) if isinstance(F, tuple) and len(F) == 2 else (F, 1)
+		for F in factors
+	]
+
+# Given the numerator and a list of pairs (f, e) whose product is the
+# denominator, determine the polynomial ring, the numerator and the denominator
+# signature without expanding the denominator. Factors that are products of
+# factors (1 - M) go straight into the signature. If there are other factors,
+# these are processed by get_signature together with the factors written as
+# (M - 1), as SageMath writes them, since they may combine into factors (1 - M),
+# as in (x - 1)*(x^2 + x + 1) = x^3 - 1.
+def process_factored_input(num, factors:list, verify:str="exact"):
+	Q = num*prod(f for f, _ in factors)
+	if Q in QQ:
+		return process_input(num, dem=prod(f**e for f, e in factors), verify=verify)
+	try:
+		varbs = Q.parent().gens() if Q.parent() != SR else Q.variables()
+	except AttributeError:
+		varbs = Q.variables()
+	P = PolynomialRing(QQ, varbs)
+	R = PolynomialRing(ZZ, varbs)
+	N = P(num) if num in QQ else P(get_poly(num, P))
+	sig = {"coefficient": ZZ(1), "monomial": tuple([0]*len(varbs)), "factors": {}}
+	polys = []
+	for f, e in factors:
+		F = P(f) if f in QQ else P(get_poly(f, P))
+		if e < 0:
+			N *= F**(-e)
+			continue
+		d = F.denominator()
+		N *= d**e
+		F = R(F*d)
+		if F in ZZ:
+			sig["coefficient"] *= F**e
+			continue
+		polys.append((F, e))
+	u = N.denominator()
+	N = R(N*u)
+	sig["coefficient"] *= u
+	peeled = [peel_binomials(R, F) for F, _ in polys]
+	mixed = any(T is None for T in peeled)
+	residual = R.one()
+	for T, (F, e) in zip(peeled, polys):
+		if T is None or (mixed and T[0] < 0):
+			residual *= F**e
+			continue
+		c, m, F_factors = T
+		sig["coefficient"] *= c**e
+		sig["monomial"] = tuple(a + e*b for a, b in zip(sig["monomial"], m))
+		for v, k in F_factors.items():
+			sig["factors"][v] = sig["factors"].get(v, 0) + e*k
+	sig["factors"] = sort_factors(sig["factors"])
+	if residual != 1:
+		N, res_sig = get_signature(R, N, residual, verify=verify)
+		_, sig = multiply_data((R.one(), sig), (R.one(), res_sig))
+	if sig["coefficient"] < 0:
+		N = -N
+		sig["coefficient"] = -sig["coefficient"]
+	return (R, N, sig, get_brat_type(R, N, sig))
+
+# Given the validated input of the brat constructor, return the tuple of the
+# polynomial ring, the numerator, the denominator signature, and the brat type.
+# The active disk cache, if any, is consulted first.
+def process_brat_input(N, D, sig, fix:bool, verify:str, den_factors):
+	disk = get_disk_cache()
+	if disk is not None:
+		key = input_key(N, den_factors if den_factors is not None else D, sig, fix, verify)
+		stored = disk.get(key)
+		if stored is not None:
+			return data_from_dict(stored)
+	if den_factors is None:
+		T = process_input(N, dem=D, sig=sig, fix=fix, verify=verify)
+	else:
+		T = process_factored_input(N, den_factors, verify=verify)
+	if disk is not None:
+		disk.put(key, data_to_dict(*T))
+	return T
+
+# Given the string of a brat, a latex flag, variables (or None), and the display
+# settings, return the brat. The numerator is built from its terms and the
+# factors (1 - X^v) of the denominator go straight into the signature; other
+# factors of the denominator are processed as in the brat constructor.
+def string_to_brat(s:str, latex:bool, variables, increasing_order:bool, hide_monomial:bool):
+	names = display = None
+	if variables is not None:
+		if hasattr(variables, "gens"):
+			variables = variables.gens()
+		names = [str(x) for x in variables]
+		display = names
+		if len(names) > 0:
+			display = variable_strings(PolynomialRing(ZZ, names), latex)
+	data = parse_brat(s, latex=latex, names=names, display=display)
+	names = data["variables"]
+	R = QQ if len(names) == 0 else PolynomialRing(ZZ, names)
+	N = dict_poly(R, {k: ZZ(a) for k, a in data["numerator"].items()})
+	c = ZZ(data["coefficient"])
+	if c == 0:
+		raise ValueError("Denominator is zero.")
+	m = [ZZ(a) for a in data["monomial"]]
+	if data["residual"]:
+		D = [c*vec_to_poly(R, [max(a, 0) for a in m])]
+		N *= vec_to_poly(R, [max(-a, 0) for a in m])
+		D += [(1 - vec_to_poly(R, v), e) for v, e in data["factors"].items()]
+		D += [(dict_poly(R, f), e) for f, e in data["residual"]]
+		return brat(
+			numerator=N,
+			denominator=D,
+			increasing_order=increasing_order,
+			hide_monomial=hide_monomial,
+		)
+	factors = {}
+	for v, e in data["factors"].items():
+		v = tuple(ZZ(a) for a in v)
+		if not is_preferred_vector(v):
+			# (1 - X^v) = -X^v*(1 - X^-v)
+			c *= (-1)**e
+			m = [a + e*b for a, b in zip(m, v)]
+			v = tuple(-a for a in v)
+		factors[v] = factors.get(v, 0) + e
+	# The denominator is kept as written, so the content is not cancelled.
+	N, sig = normalize_signature_data(R, N, c, m, factors, cancel=False)
+	return build_brat(R, N, sig, increasing_order, hide_monomial)
+
+# Given the polynomial ring R, a numerator N, a denominator signature sig, a
+# bound on the total degree (or None), and a list of bounds on the exponents of
+# each variable (or None), return the dictionary of the nonzero coefficients of
+# the series expansion of N/sig in the region given by the bounds.
+def series_table(R, N, sig:dict, max_degree, bounds) -> dict:
+	if R == QQ:
+		if max_degree is not None and max_degree < 0:
+			return {}
+		return {(): N/sig["coefficient"]} if N != 0 else {}
+	k = len(R.gens())
+	if bounds is None:
+		bounds = [None]*k
+	if len(bounds) != k:
+		raise ValueError(f"Expected {k} bounds.")
+	if max_degree is None and None in bounds:
+		raise ValueError("Every variable must be bounded.")
+	if any(a < 0 for v in sig["factors"] for a in v):
+		raise ValueError("Series expansions require factors with non-negative exponents.")
+	# Work with N/X^m, whose exponents are shifted up by m.
+	m = [int(a) for a in sig["monomial"]]
+	total = None if max_degree is None else int(max_degree) + sum(m)
+	upper = [
+		(total if b is None else int(b) + a) for a, b in zip(m, bounds)
+	]
+	if total is None:
+		total = sum(upper)
+	upper = [min(u, total) for u in upper]
+	if total < 0 or any(u < 0 for u in upper):
+		return {}
+	X, coeffs = multivariate_series(
+		{tuple(int(a) for a in e): int(c) for e, c in poly_dict(R, N).items()},
+		{tuple(int(a) for a in v): int(e) for v, e in sig["factors"].items()},
+		upper,
+		total,
+	)
+	keep = coeffs != 0
+	exps = map(tuple, (X[keep] - m).tolist())
+	c = sig["coefficient"]
+	if c == 1:
+		return dict(zip(exps, map(ZZ, coeffs[keep].tolist())))
+	return {e: QQ(a)/c for e, a in zip(exps, coeffs[keep].tolist())}
+
+# Given polynomials P and Q over ZZ in one variable with Q(0) != 0 and a
+# non-negative integer n, return the coefficient of t^n in the power series
+# P/Q. This is the algorithm of Bostan and Mori: since Q(t)Q(-t) is even, the
+# coefficient is read off the even or odd part of P(t)Q(-t) over Q(t)Q(-t),
+# halving n each time.
+def bostan_mori(P, Q, n:int):
+	R = P.parent()
+	while n > 0:
+		Q_neg = R([-c if i % 2 else c for i, c in enumerate(Q.list())])
+		U = (P*Q_neg).list()
+		V = (Q*Q_neg).list()
+		P = R(U[n % 2::2])
+		Q = R(V[::2])
+		n //= 2
+	return P[0]/Q[0]
+
+# Given the polynomial ring R in one variable (or QQ), a numerator N, and a
+# denominator signature sig, return the QuasiPolynomial of the coefficients of N/sig. The
+# constituents are interpolated from a prefix of the series: for n beyond the
+# polynomial part, the coefficients are a quasi-polynomial whose period is the
+# lcm of the exponents of the factors and whose degree is less than the sum of
+# their multiplicities.
+def compute_quasipolynomial(R, N, sig:dict) -> QuasiPolynomial:
+	if R == QQ:
+		S = PolynomialRing(QQ, "n")
+		return QuasiPolynomial(1, [S.zero()], 1, {0: QQ(N)/sig["coefficient"]}, 0)
+	m = int(sig["monomial"][0])
+	factors = {int(v[0]): int(e) for v, e in sig["factors"].items()}
+	period = int(lcm(list(factors) + [1]))
+	d = sum(factors.values()) - 1
+	D = sum(a*e for a, e in factors.items())
+	k0 = max(0, N.degree() - D + 1)
+	coeffs = univariate_series(
+		{int(k[0]): int(c) for k, c in poly_dict(R, N).items()},
+		factors,
+		k0 + period*(d + 1),
+	)
+	c = sig["coefficient"]
+	a = lambda n: QQ(coeffs[n + m])/c
+	start = k0 - m
+	S = PolynomialRing(QQ, "n")
+	constituents = [None]*period
+	for j in range(period):
+		n = start + j
+		constituents[n % period] = S.lagrange_polynomial(
+			[(n + period*i, a(n + period*i)) for i in range(d + 1)]
+		)
+	exceptions = {n: a(n) for n in range(-m, start)}
+	return QuasiPolynomial(period, constituents, start, exceptions, -m)
+
+# Given a NumPy array of points and the number of variables k, return the list
+# of the arrays of values of each variable. For k = 1, the array can also just
+# hold the values.
+def point_columns(X, k:int) -> list:
+	if X.dtype.kind in "biu":
+		X = X.astype(float)
+	elif X.dtype.kind == "O":
+		# For example, arrays of SageMath numbers
+		try:
+			X = X.astype(float)
+		except (TypeError, ValueError):
+			X = X.astype(complex)
+	if k == 1 and (X.ndim == 0 or X.shape[-1] != 1):
+		return [X]
+	if X.ndim == 0 or X.shape[-1] != k:
+		raise ValueError(f"Points must have {k} coordinates.")
+	return [X[..., i] for i in range(k)]
+
+# The attributes of a brat that are computed on first access for lazy brats.
+LAZY_ATTRIBUTES = ("_ring", "_n_poly", "_d_sig", "_type")
+
+# Given objects, return True if one of them is a brat whose data has not been
+# computed yet.
+def is_pending(*args) -> bool:
+	return any(
+		isinstance(B, brat) and B.__dict__.get("_pending") is not None 
+		for B in args
+	)
+
+# Given a binary operation and its two arguments, at least one of which is a
+# brat, return the tuple of data for the brat op(A, B). Pending arguments are
+# already forced by force_pending.
+def operation_data(op, A, B) -> tuple:
+	C = op(A, B)
+	if not isinstance(C, brat):
+		raise ValueError("Result of the operation is not a brat.")
+	return (C._ring, C._n_poly, C._d_sig, C._type)
+
+# Given a binary operation and its two arguments, at least one of which is a
+# lazy brat, return a lazy brat for op(A, B).
+def lazy_operation(op, A, B):
+	C = brat.__new__(brat)
+	C.increasing_order = True
+	C.hide_monomial = True
+	C._factor = False
+	C._pending = (operation_data, (op, A, B))
+	return C
+
+# Given a lazy brat, return the list of pending brats its deferred computation
+# depends on.
+def pending_operands(B) -> list:
+	func, args = B._pending
+	if func is not operation_data:
+		return []
+	return [X for X in args[1:] if is_pending(X)]
+
+# Given a lazy brat, compute its data and the data of all pending brats it
+# depends on. The brats are visited with an explicit stack instead of recursion,
+# so long chains of lazy operations do not exceed the recursion limit.
+def force_pending(B):
+	stack = [B]
+	while len(stack) > 0:
+		X = stack[-1]
+		if not is_pending(X):
+			stack.pop()
+			continue
+		operands = pending_operands(X)
+		if len(operands) > 0:
+			stack += operands
+			continue
+		func, args = X._pending
+		T = func(*args)
+		my_print(DEBUG, f"Output of deferred processing:\n\t{T}")
+		X._ring, X._n_poly, X._d_sig, X._type = T
+		X._pending = None
+		stack.pop()
+
+# Given a lazy brat, return its rational function. Where possible, the
+# denominator signatures of the pending brats it depends on are not computed.
+# As in force_pending, the brats are visited with an explicit stack.
+def pending_rational_function(B):
+	values = {}
+	value = lambda X: values[id(X)] if isinstance(X, brat) else X
+	stack = [B]
+	while len(stack) > 0:
+		X = stack[-1]
+		if id(X) in values:
+			stack.pop()
+			continue
+		if not is_pending(X):
+			values[id(X)] = X._n_poly / unfold_signature(X._ring, X._d_sig)
+			stack.pop()
+			continue
+		func, args = X._pending
+		if func is operation_data:
+			op, A, C = args
+			operands = [
+				Y for Y in (A, C) if isinstance(Y, brat) and not id(Y) in values
+			]
+			if len(operands) > 0:
+				stack += operands
+				continue
+			values[id(X)] = op(value(A), value(C))
+		else:
+			N, D, _, _, _, den_factors = args
+			if den_factors is not None:
+				values[id(X)] = N/prod(f**e for f, e in den_factors)
+			elif D is not None:
+				values[id(X)] = N/D
+			else:
+				force_pending(X)
+				values[id(X)] = X._n_poly / unfold_signature(X._ring, X._d_sig)
+		stack.pop()
+	return values[id(B)]
+
+# Given a LaTeX string and an integer e, return the LaTeX string of the power,
+# with braces around the exponent only if needed.
+def latex_power(base:str, e) -> str:
+	e = str(e)
+	if len(e) == 1:
+		return f"{base}^{e}"
+	return f"{base}^{{{e}}}"
+
 # Given variables, a vector of integers, and a latex flag, return the associated
 # monomial.
 def vec_to_mono(varbs:list[str], vec:list[int], latex:bool) -> str:
@@ -376,288 +1139,417 @@ def vec_to_mono(varbs:list[str], vec:list[int], latex:bool) -> str:
 			strings.append(x)
 		else:
 			if latex:
-				strings.append(f"{x}^{{{vec[i]}}}")
+				strings.append(latex_power(x, vec[i]))
 			else:
 				strings.append(f"{x}^{vec[i]}")
 	if latex:
 		return "".join(strings)
 	return "*".join(strings)
 
-# Given a polynomial ring, an element in the base field, and a pair of monomials
-# mono and neg, and a latex flag, return the string representing the Laurent
-# monomial coeff*mono/neg.
-def stringify(poly_ring, coeff, mono, neg, latex:bool) -> str:
-	if latex:
-		wrap = lambda X: LaTeX(X)
-		mult = ""
-	else:
-		wrap = lambda X: str(X)
-		mult = "*"
-	if len(poly_ring.gens()) == 1:
-		deg_vec = [mono.degree() - neg.degree()]
-	else:
-		deg_vec = [mono.degree(x) - neg.degree(x) for x in poly_ring.gens()]
-	varbs = list(map(wrap, poly_ring.gens()))
-	if mono/neg in poly_ring.base_ring():
+# Given variable strings, a coefficient, an exponent vector, and a latex flag,
+# return the string representing the Laurent monomial coeff*X^vec.
+def stringify(varbs:list[str], coeff, vec, latex:bool) -> str:
+	mono = vec_to_mono(varbs, vec, latex)
+	if mono == "":
 		return f"{coeff}"
 	if coeff == 1:
-		return vec_to_mono(varbs, deg_vec, latex)
+		return mono
 	if coeff == -1:
-		return f"-{vec_to_mono(varbs, deg_vec, latex)}"
-	return f"{coeff}{mult}{vec_to_mono(varbs, deg_vec, latex)}"
+		return f"-{mono}"
+	if latex:
+		return f"{coeff}{mono}"
+	return f"{coeff}*{mono}"
+
+# Given a polynomial ring and a latex flag, return the list of strings for the
+# variables. These are computed once per ring.
+def variable_strings(R, latex:bool) -> list[str]:
+	key = (R, latex)
+	if not key in VARIABLE_STRINGS:
+		if latex:
+			VARIABLE_STRINGS[key] = [
+				remove_unnecessary_braces_and_spaces(str(LaTeX(x))) for x in R.gens()
+			]
+		else:
+			VARIABLE_STRINGS[key] = [str(x) for x in R.gens()]
+	return VARIABLE_STRINGS[key]
+
+# The variable strings of each polynomial ring used for printing.
+VARIABLE_STRINGS = {}
+
+# Given a polynomial f and an order flag, return the list of pairs of exponent
+# tuples and coefficients of the terms of f, ordered by increasing or
+# decreasing degree with respect to the term order of its parent.
+def polynomial_terms(f, inc_ord:bool) -> list:
+	if len(f.parent().gens()) == 1:
+		# Exponents of univariate polynomials come in increasing order
+		terms = [((e,), c) for e, c in zip(f.exponents(), f.coefficients())]
+		return terms if inc_ord else terms[::-1]
+	terms = [(tuple(e), c) for e, c in zip(f.exponents(), f.coefficients())]
+	return terms[::-1] if inc_ord else terms
+
+# Given variable strings, a list of terms as in polynomial_terms, an exponent
+# vector shift, a sign flip, and a latex flag, yield the strings of the terms
+# times flip, each divided by the monomial with exponent shift, with the signs
+# between them.
+def term_strings(varbs:list[str], terms:list, shift, flip:int, latex:bool):
+	shifted = any(shift)
+	for i, (e, c) in enumerate(terms):
+		c = flip*c
+		if shifted:
+			e = tuple(a - b for a, b in zip(e, shift))
+		if i == 0:
+			yield stringify(varbs, c, e, latex)
+		elif c > 0:
+			yield " + " + stringify(varbs, c, e, latex)
+		else:
+			yield " - " + stringify(varbs, -c, e, latex)
+
+# Given variable strings, a list of terms as in polynomial_terms, an exponent
+# vector shift, and a latex flag, return the string of the sum of the terms,
+# each divided by the monomial with exponent shift, together with the sign
+# pulled out so that the first coefficient is positive.
+def join_terms(varbs:list[str], terms:list, shift, latex:bool) -> tuple:
+	flip = -1 if terms[0][1] < 0 else 1
+	return ("".join(term_strings(varbs, terms, shift, flip, latex)), flip)
+
+# Given data as in format_numerator, yield the strings that make up the
+# formatted and expanded numerator in order.
+def iter_numerator(numer, neg, inc_ord:bool, latex:bool):
+	terms = polynomial_terms(numer, inc_ord)
+	if len(terms) == 0:
+		return
+	varbs = variable_strings(numer.parent(), latex)
+	flip = -1 if terms[0][1] < 0 else 1
+	wrap = flip == -1 and len(terms) > 1
+	if flip == -1:
+		yield "-(" if wrap else "-"
+	yield from term_strings(varbs, terms, neg, flip, latex)
+	if wrap:
+		yield ")"
 
 # Given data, format the numerator. Returns the formatted and expanded numerator
 # as a string.
 def format_numerator(
 		numer,			# numerator polynomial 
-		neg,			# denominator monomial
+		neg,			# exponent vector of the denominator monomial
 		inc_ord:bool,
 		latex:bool,
 	) -> str:
-	# initial set up
-	P = numer.parent()
-	ORD = -1 if inc_ord else 1
-
-	n_str = ""
-	mon_n = numer.monomials()
-	flip = 1
-	unit = 1
-	for i, m in enumerate(mon_n[::ORD]):
-		c = numer.monomial_coefficient(m)
-		if i == 0:
-			if c < 0:
-				flip = -1
-				unit = -unit
-			n_str += stringify(P, flip*c, m, neg, latex)
-		else: 
-			if flip*c > 0:
-				n_str += " + " + stringify(
-					P, flip*numer.monomial_coefficient(m), m, neg, latex
-				)
-			else:
-				n_str += " - " + stringify(
-					P, -flip*numer.monomial_coefficient(m), m, neg, latex
-				)
-	if unit != 1: 		# unit is only 1 or -1
-		if ' + ' in n_str or ' - ' in n_str:
-			n_str = f"-({n_str})"
-		else:
-			n_str = f"-{n_str}"
-	return n_str
+	return "".join(iter_numerator(numer, neg, inc_ord, latex))
 
 # Given data, format the numerator. Returns the formatted and factored numerator
 # as a string.
 def format_factored_numerator(
 		numer,
-		neg,
+		neg,			# exponent vector of the denominator monomial
 		inc_ord:bool,
 		latex:bool,
 	) -> str:
 	# initial set up
-	ORD = -1 if inc_ord else 1
 	P = numer.parent()
+	varbs = variable_strings(P, latex)
+	zero = tuple([0]*len(neg))
+	inv_neg = tuple(-a for a in neg)
 	
-	factors = list(numer.factor())
-	unit = numer.factor().unit()
-	n_str = ""
+	numer_factored = cached_factor(numer)
+	factors = list(numer_factored)
+	unit = numer_factored.unit()
+	strings = []
 	for f, e in factors:
-		f_str = ""
-		mon_n = f.monomials()
-		flip = 1
-		for i, m in enumerate(mon_n[::ORD]):
-			c = f.monomial_coefficient(m)
-			if i == 0:
-				if c < 0:
-					flip = -1
-					unit = (-1)**e*unit
-				f_str += stringify(P, flip*c, m, P(1), latex)
-			else: 
-				if flip*c > 0:
-					f_str += " + " + stringify(
-						P, flip*f.monomial_coefficient(m), m, P(1), latex
-					)
-				else:
-					f_str += " - " + stringify(
-						P, -flip*f.monomial_coefficient(m), m, P(1), latex
-					)
+		terms = polynomial_terms(f, inc_ord)
+		f_str, flip = join_terms(varbs, terms, zero, latex)
+		if flip == -1:
+			unit = (-1)**e*unit
 		if e > 1:
-			if len(mon_n) != 1:
+			if len(terms) != 1:
 				f_str = f"({f_str})"
 			if latex:
-				f_str = f"{f_str}^{{{e}}}"
+				f_str = latex_power(f_str, e)
 			else:
 				f_str = f"{f_str}^{e}*"
-		elif (len(factors) > 1 or unit != 1):
-			if len(f.monomials()) != 1:
-				if latex:
-					f_str = f"({f_str})"
-				else:
-					f_str = f"({f_str})*"
-			else:
-				if latex:
-					f_str = f"{f_str}"
-				else:
-					f_str = f"{f_str}*"
-		n_str += f_str
+		elif (len(factors) > 1 or unit != 1 or any(neg)):
+			if len(terms) != 1:
+				f_str = f"({f_str})"
+			if not latex:
+				f_str = f"{f_str}*"
+		strings.append(f_str)
+	n_str = "".join(strings)
 	
 	# If we still have an empty string, it will just be the monomial unit*neg
 	# that we need.
 	if len(n_str) == 0:
-		return f"{stringify(P, unit, P(1), P(neg), latex)}"
+		return stringify(varbs, unit, inv_neg, latex)
 	
 	# Now we can assume the string is not empty.
 	if n_str[-1] == "*":
 		n_str = n_str[:-1]
-	if unit*neg != 1:
-		if unit*neg == -1:
+	if unit != 1 or any(neg):
+		if unit == -1 and not any(neg):
 			n_str = "-" + n_str
 		else:
 			if latex:
-				return f"{stringify(P, unit, P(1), P(neg), latex)}{n_str}"
-			return f"{stringify(P, unit, P(1), P(neg), latex)}*{n_str}"
+				return f"{stringify(varbs, unit, inv_neg, latex)}{n_str}"
+			return f"{stringify(varbs, unit, inv_neg, latex)}*{n_str}"
 	return n_str
 
 # Given data, return the formatted denominator as a string.
 def format_denominator(R, sig:dict, latex:bool, hidden_mono:bool) -> str:
 	from .util import at_least_two
-	def wrap(v:tuple[int]):
-		mono = prod(x**e for x, e in zip(R.gens(), v) if e > 0)
-		neg = prod(x**(-e) for x, e in zip(R.gens(), v) if e < 0)
-		return stringify(R, R(1), R(mono), R(neg), latex)
-	mono_factor = prod(x**e for x, e in zip(R.gens(), sig["monomial"]))
-	d_str = ""
+	varbs = variable_strings(R, latex)
+	mono = sig["monomial"]
+	mono_support = sum(1 for a in mono if a != 0)
+	strings = []
 	if sig["coefficient"] != 1:
-		d_str += stringify(R, sig["coefficient"], R(1), R(1), latex)
-		if (len(sig["factors"]) > 0 or mono_factor != 1) and not latex:
-			d_str += "*"
-	if mono_factor != 1:
-		d_str += stringify(R, R(1), mono_factor, R(1), latex)
+		strings.append(f"{sig['coefficient']}")
+		if (len(sig["factors"]) > 0 or mono_support > 0) and not latex:
+			strings.append("*")
+	if mono_support > 0:
+		strings.append(vec_to_mono(varbs, mono, latex))
 		if len(sig["factors"]) > 0 and not latex:
-			d_str += "*"
+			strings.append("*")
 	gp_list = list(sig["factors"].items())
 	gp_list.sort(key=lambda x: sum(x[0]))
-	for v, e in gp_list:
+	for i, (v, e) in enumerate(gp_list):
 		if e == 1:
-			d_str += f"(1 - {wrap(v)})"
+			strings.append(f"(1 - {vec_to_mono(varbs, v, latex)})")
+		elif latex:
+			strings.append(latex_power(f"(1 - {vec_to_mono(varbs, v, latex)})", e))
 		else:
-			if latex:
-				d_str += f"(1 - {wrap(v)})^{{{e}}}"
-			else:
-				d_str += f"(1 - {wrap(v)})^{e}"
-		if not latex and gp_list[-1] != (v, e):
-			d_str += "*"
+			strings.append(f"(1 - {vec_to_mono(varbs, v, latex)})^{e}")
+		if not latex and i < len(gp_list) - 1:
+			strings.append("*")
+	d_str = "".join(strings)
 	
 	if latex:
 		if hidden_mono:
 			if len(sig["factors"]) == 1 and list(sig["factors"].values())[0] == 1 and sig["coefficient"] == 1:
 				d_str = d_str[1:-1]
 		else:
-			if len(sig["factors"]) == 1 and list(sig["factors"].values())[0] == 1 and sig["coefficient"] == 1 and list(sig["monomial"]) == [0]*len(sig["monomial"]):
+			if len(sig["factors"]) == 1 and list(sig["factors"].values())[0] == 1 and sig["coefficient"] == 1 and mono_support == 0:
 				d_str = d_str[1:-1]
 		return d_str
-	if len(gp_list) > 1 or len(mono_factor.factor()) > 1 or at_least_two(
+	if len(gp_list) > 1 or mono_support > 1 or at_least_two(
 		sig["coefficient"] != 1, 
-		mono_factor != 1,
+		mono_support > 0,
 		len(gp_list) > 0
 	):
 		return f"({d_str})"
 	return d_str
 
-def format_polynomial_for_align(POLY, COLWIDTH, first=0):
-	def split_polynomial(poly):
-		terms = []
-		i = 0
-		while i < len(poly):
-			start = i
-			if poly[i] in '+-':
-				i += 1
-			while i < len(poly) and poly[i] not in '+-':
-				i += 1
-			terms.append(poly[start:i].strip())
-		return terms
-	terms = split_polynomial(POLY)
-	output_lines = []
-	current_line = ""
-	capped = lambda curr, t, extra: len(curr) + len(t) > COLWIDTH - extra
-	for term in terms:
-		if (len(output_lines) == 0 and capped(current_line, term, first)) or (len(output_lines) > 0 and capped(current_line, term, 0)):
-			if current_line:
-				output_lines.append(current_line)
-			current_line = term
+# Writes a polynomial, given in pieces of strings, to a text stream as lines of
+# an align* environment. Terms start at each + or - and are kept whole; a new
+# line is started once a line would be longer than COLWIDTH characters, and the
+# first line leaves room for first extra characters. Only the current line and
+# term are held in memory.
+class AlignWriter:
+
+	def __init__(self, stream, COLWIDTH:int, first:int=0):
+		self.stream = stream
+		self.width = COLWIDTH
+		self.first = first
+		self.lines = 0
+		self.line = ""
+		self.carry = ""
+
+	def write(self, chunk:str):
+		pieces = re.split(r"(?=[+-])", self.carry + chunk)
+		self.carry = pieces.pop()
+		for term in pieces:
+			if term:
+				self._add_term(term.strip())
+
+	def close(self):
+		if self.carry:
+			self._add_term(self.carry.strip())
+			self.carry = ""
+		if self.line:
+			self._write_line(self.line)
+			self.line = ""
+
+	def _add_term(self, term:str):
+		extra = self.first if self.lines == 0 else 0
+		if len(self.line) + len(term) > self.width - extra:
+			if self.line:
+				self._write_line(self.line)
+			self.line = term
+		elif self.line:
+			self.line += " " + term
 		else:
-			if current_line:
-				current_line += " " + term
-			else:
-				current_line = term
-	if current_line:
-		output_lines.append(current_line)
-	output_string = " \\\\ \n\t&\\quad ".join(output_lines)
-	return output_string
-
-def brat_to_str(B, latex=False) -> str:
+			self.line = term
+
+	def _write_line(self, line:str):
+		if self.lines > 0:
+			self.stream.write(" \\\\ \n\t&\\quad ")
+		self.stream.write(line)
+		self.lines += 1
+
+# Given a brat and a latex flag, return the pair of strings of the numerator and
+# the denominator, where the denominator is None if it is trivial. LaTeX is
+# emitted in its final form: exponents with one character are not wrapped in
+# braces. If stream is True, an expanded numerator is returned as an iterator of
+# strings instead.
+def brat_parts(B, latex=False, stream=False) -> tuple:
 	if B._factor:
 		numerator = format_factored_numerator
+	elif stream:
+		numerator = iter_numerator
 	else:
 		numerator = format_numerator
-	if latex:
-		quo = lambda n, d: f"\\dfrac{{{n}}}@{{{d}}}"
-	else:
-		quo = lambda n, d: f"{parenthesis_wrap(str(n))}/{d}"
 	my_print(DEBUG, f"Printing with type {B._type.name}")
 
 	if B._type.name == "INTEGER":
-		return f"{B._n_poly}"
+		return (f"{B._n_poly}", None)
 	if B._type.name == "RATIONAL":
-		return quo(B._n_poly, B._d_sig["coefficient"])
+		return (f"{B._n_poly}", f"{B._d_sig['coefficient']}")
 	
 	# Polynomial
+	zero = tuple([0]*len(B._ring.gens()))
 	if B._type.name in ["INTEGRAL_POLY", "RATIONAL_POLY"]:
 		N = numerator(
 			B._n_poly,
-			B._ring(1),
+			zero,
 			B.increasing_order,
 			latex,
 		)
 		if B._type.name == "INTEGRAL_POLY":
-			return f"{N}"
-		return quo(N, B._d_sig["coefficient"])
+			return (N, None)
+		return (N, f"{B._d_sig['coefficient']}")
 	
 	# Laurent polynomial
 	if B._type.name in ["INTEGRAL_L_POLY", "RATIONAL_L_POLY"] and B.hide_monomial:
-		vars_vec = zip(B._ring.gens(), B._d_sig["monomial"])
-		monomial = prod(x**e for x, e in vars_vec)
 		N = numerator(
 			B._n_poly,
-			monomial,
+			B._d_sig["monomial"],
 			B.increasing_order,
 			latex,
 		)
 		if B._type.name == "INTEGRAL_L_POLY":
-			return f"{N}"
-		return quo(N, B._d_sig["coefficient"])
+			return (N, None)
+		return (N, f"{B._d_sig['coefficient']}")
 
 	# Rational function
 	if B.hide_monomial:
-		vars_vec = zip(B._ring.gens(), B._d_sig["monomial"])
-		monomial = prod(x**e for x, e in vars_vec)
 		N = numerator(
 			B._n_poly,
-			monomial,
+			B._d_sig["monomial"],
 			B.increasing_order,
 			latex,
 		)
 		sig = deep_sig_copy(B._d_sig)
-		sig["monomial"] = tuple([0]*len(B._ring.gens()))
+		sig["monomial"] = zero
 	else:
 		N = numerator(
 			B._n_poly,
-			B._ring(1),
+			zero,
 			B.increasing_order,
 			latex,
 		)
 		sig = B._d_sig
 	D = format_denominator(B._ring, sig, latex, B.hide_monomial)
-	return quo(N, D)
+	return (N, D)
+
+# Given the strings of a numerator and a denominator (or None) and a latex flag,
+# return the string of the quotient.
+def join_parts(N:str, D, latex=False) -> str:
+	if D is None:
+		return N
+	if latex:
+		return f"\\dfrac{{{N}}}{{{D}}}"
+	return f"{parenthesis_wrap(N)}/{D}"
+
+def brat_to_str(B, latex=False) -> str:
+	return join_parts(*brat_parts(B, latex), latex)
+
+# Given a text stream, a brat, and the options of write_latex, write the LaTeX
+# of the brat to the stream. The numerator is generated and written term by
+# term, so the whole string is never held in memory.
+def write_latex_to_stream(
+		stream, 
+		B, 
+		just_numerator:bool, 
+		just_denominator:bool, 
+		align:bool, 
+		line_width:int, 
+		function_name:str,
+	):
+	N, D = brat_parts(B, latex=True, stream=True)
+	if isinstance(N, str):
+		N = [N]
+	if just_numerator:
+		pieces = N
+	elif just_denominator:
+		pieces = ["1" if D is None else D]
+	elif D is None:
+		pieces = N
+	else:
+		pieces = chain(["\\dfrac{"], N, ["}{", D, "}"])
+	if not function_name is None:
+		if align:
+			function_name = f"{function_name} &= "
+		else:
+			function_name = f"{function_name} = "
+	else:
+		function_name = ""
+	if align:
+		stream.write(f"\\begin{{align*}}\n\t{function_name}")
+		writer = AlignWriter(stream, line_width, first=len(function_name))
+		for piece in pieces:
+			writer.write(piece)
+		writer.close()
+		stream.write("\n\\end{align*}")
+	else:
+		stream.write(f"\\[\n\t{function_name}")
+		for piece in pieces:
+			stream.write(piece)
+		stream.write("\n\\]")
+
+# Given the options of write_latex, raise an error if they are incompatible.
+def check_latex_options(just_numerator:bool, just_denominator:bool, line_width:int):
+	if just_numerator and just_denominator:
+		raise ValueError("'just_numerator' and 'just_denominator' cannot both be True.")
+	if line_width < 60:
+		raise ValueError("line width must be at least 60.")
+
+# Given a tuple of a brat, a function name, and the remaining options of
+# write_latex, return the LaTeX block as a string. Used by worker processes.
+def latex_block(job:tuple) -> str:
+	B, name, just_numerator, just_denominator, align, factor, line_width = job
+	output = StringIO()
+	write_latex_to_stream(
+		output,
+		B._with_factor(factor or B._factor),
+		just_numerator,
+		just_denominator,
+		align,
+		line_width,
+		name,
+	)
+	return output.getvalue()
+
+# Given a triple of the index of an input, the input, and keyword arguments for
+# brat, return the pair (True, data) where data is the output of data_to_dict for
+# the constructed brat, or (False, e) if constructing the brat raised the
+# exception e. The input is a rational function, a pair of a numerator and a
+# denominator, or a dictionary of keyword arguments. Used by worker processes.
+# Exceptions that cannot be sent back to the main process are replaced by a
+# RuntimeError with the index and the repr of the exception, so that one input
+# does not fail the whole batch.
+def construct_data(job:tuple) -> tuple:
+	i, x, kwargs = job
+	try:
+		if isinstance(x, dict):
+			B = brat(**x, **kwargs)
+		elif isinstance(x, tuple) and len(x) == 2:
+			B = brat(numerator=x[0], denominator=x[1], **kwargs)
+		else:
+			B = brat(x, **kwargs)
+		return (True, data_to_dict(B._ring, B._n_poly, B._d_sig, B._type))
+	except Exception as e:
+		try:
+			pickle.loads(pickle.dumps(e))
+		except Exception:
+			e = RuntimeError(f"Input {i} raised {e!r}")
+		return (False, e)
 
 # The main class of BRational.
 class brat:
@@ -668,7 +1560,7 @@ class brat:
 
 	- ``numerator``: the numerator polynomial of the rational function (default: ``None``),
 
-	- ``denominator``: the denominator polynomial of the rational function (default: ``None``),
+	- ``denominator``: the denominator polynomial of the rational function, or a list or ``Factorization`` of its factors (default: ``None``),
 
 	- ``denominator_signature``: the dictionary of data for the denominator (default: ``None``),
 
@@ -676,7 +1568,11 @@ class brat:
 
 	- ``increasing_order``: whether to display polynomials in increasing degree (default: ``True``),
 
-	- ``hide_monomial``: whether to absorb the monomial in the denominator into the numerator (default: ``True``).
+	- ``hide_monomial``: whether to absorb the monomial in the denominator into the numerator (default: ``True``),
+
+	- ``verify``: how to check the computed form of the rational function: ``"exact"`` compares cross-multiplied polynomials, ``"modular"`` compares values at random points modulo large primes, and ``"off"`` skips the check (default: ``"exact"``),
+
+	- ``lazy``: whether to defer computing the denominator signature until it is needed, e.g. for printing (default: ``False``).
 	"""
 
 	def __init__(self, 
@@ -687,7 +1583,22 @@ class brat:
 			fix_denominator:bool=True,
 			increasing_order:bool=True,
 			hide_monomial:bool=True,
+			verify:str="exact",
+			lazy:bool=False,
 		):
+		if not verify in ["exact", "modular", "off"]:
+			raise ValueError("Verification must be one of 'exact', 'modular', or 'off'.")
+
+		# A factored rational expression is split into numerator and factors
+		if isinstance(rational_expression, Factorization):
+			if numerator is not None or denominator is not None:
+				raise ValueError("Do not provide a rational expression and a numerator or denominator.")
+			numerator = rational_expression.unit()*prod(
+				f**e for f, e in rational_expression if e > 0
+			)
+			denominator = [(f, -e) for f, e in rational_expression if e < 0]
+			rational_expression = None
+
 		# Don't give me too much! 
 		if rational_expression is not None and numerator is not None:
 			raise ValueError("Do not provide a rational expression and a numerator.")
@@ -698,6 +1609,18 @@ class brat:
 		if denominator is not None and denominator_signature is not None:
 			raise ValueError("Do not provide a denominator and a denominator signature.")
 
+		# Denominators can be given as a list of factors
+		den_factors = None
+		if isinstance(denominator, (list, tuple, Factorization)):
+			den_factors = denominator_factors(denominator)
+			if any(f == 0 for f, _ in den_factors):
+				raise ValueError("Denominator cannot be zero.")
+			if fix_denominator:
+				denominator = den_factors
+			else:
+				denominator = prod(f**e for f, e in den_factors)
+				den_factors = None
+
 		# First we remove zero denominator
 		if is_denominator_zero(denominator, denominator_signature):
 			raise ValueError("Denominator cannot be zero.")
@@ -741,28 +1664,104 @@ class brat:
 		
 		# Finally process the input
 		my_print(DEBUG, f"Given\n\tNumerator: {N}\n\tDenominator: {D}\n\tSignature: {denominator_signature}")
-		T = process_input(
-			N, 
-			dem=D, 
-			sig=denominator_signature, 
-			fix=fix_denominator
-		)
+		args = (N, D, denominator_signature, fix_denominator, verify, den_factors)
+		self.increasing_order = increasing_order
+		self.hide_monomial = hide_monomial
+		self._factor = False
+		if lazy:
+			self._pending = (process_brat_input, args)
+			return
+		T = process_brat_input(*args)
 		my_print(DEBUG, f"Output of _process_intput:\n\t{T}")
 		self._ring = T[0]			# Parent ring for rational function
 		self._n_poly = T[1]			# Numerator polynomial
 		self._d_sig = T[2]			# Denominator with form \prod_i (1 - M_i)
 		self._type = T[3]			# Enum for printing
-		self.increasing_order = increasing_order
-		self.hide_monomial = hide_monomial
-		self._factor = False
+		self._pending = None		# Deferred computation of the above
+
+	# Only called when an attribute is not set, e.g. the data of a lazy brat.
+	def __getattr__(self, name):
+		if name in LAZY_ATTRIBUTES and self.__dict__.get("_pending") is not None:
+			self._force()
+			return self.__dict__[name]
+		raise AttributeError(f"'brat' object has no attribute '{name}'")
+
+	def _force(self):
+		force_pending(self)
+
+	@property
+	def increasing_order(self) -> bool:
+		return self._increasing_order
+
+	@increasing_order.setter
+	def increasing_order(self, value:bool):
+		self._increasing_order = value
+		self.__dict__["_renderings"] = {}
+
+	@property
+	def hide_monomial(self) -> bool:
+		return self._hide_monomial
+
+	@hide_monomial.setter
+	def hide_monomial(self, value:bool):
+		self._hide_monomial = value
+		self.__dict__["_renderings"] = {}
+
+	# Given a latex flag and a factor flag, return the string of the brat, or if
+	# latex is True, the pair of LaTeX strings as in brat_parts. These are kept
+	# for each combination of the display settings.
+	def _render(self, latex:bool, factor:bool):
+		renderings = self.__dict__.setdefault("_renderings", {})
+		key = (latex, factor, self.increasing_order, self.hide_monomial)
+		if not key in renderings:
+			B = self._with_factor(factor)
+			if latex:
+				renderings[key] = brat_parts(B, latex=True)
+			else:
+				renderings[key] = brat_to_str(B, latex=False)
+		return renderings[key]
+
+	# Given a factor flag, return the brat, or a shallow copy of it, whose
+	# numerator is factored according to the flag.
+	def _with_factor(self, factor:bool):
+		if is_pending(self):
+			self._force()
+		if factor == self._factor:
+			return self
+		B = copy(self)
+		B._factor = factor
+		return B
+
+	# Pickling only stores the data in terms of integers and strings together
+	# with the display settings; unpickling does not process the input again.
+	def __reduce__(self):
+		if is_pending(self):
+			self._force()
+		return (restore_brat, (
+			data_to_dict(self._ring, self._n_poly, self._d_sig, self._type),
+			self.increasing_order,
+			self.hide_monomial,
+			self._factor,
+		))
+
+	def __copy__(self):
+		B = brat.__new__(brat)
+		B.__dict__.update(self.__dict__)
+		B.__dict__["_renderings"] = {}
+		return B
 
 	def __str__(self) -> str:
-		return brat_to_str(self, latex=False)
+		return self._render(False, self._factor)
 	
 	def __repr__(self) -> str:
-		return brat_to_str(self, latex=False)
+		return self._render(False, self._factor)
 	
 	def __add__(self, other):
+		if is_pending(self, other) and (isinstance(other, brat) or other in QQ):
+			return lazy_operation(operator.add, self, other)
+		B = signature_sum(self, other, 1)
+		if B is not None:
+			return B
 		if isinstance(other, brat):
 			S = other.rational_function()
 		else:
@@ -775,6 +1774,11 @@ class brat:
 			return Q
 		
 	def __sub__(self, other):
+		if is_pending(self, other) and (isinstance(other, brat) or other in QQ):
+			return lazy_operation(operator.sub, self, other)
+		B = signature_sum(self, other, -1)
+		if B is not None:
+			return B
 		if isinstance(other, brat):
 			S = other.rational_function()
 		else:
@@ -787,6 +1791,11 @@ class brat:
 			return Q
 		
 	def __mul__(self, other):
+		if is_pending(self, other) and (isinstance(other, brat) or other in QQ):
+			return lazy_operation(operator.mul, self, other)
+		B = signature_product(self, other, 1)
+		if B is not None:
+			return B
 		if isinstance(other, brat):
 			S = other.rational_function()
 		else:
@@ -798,7 +1807,13 @@ class brat:
 		except ValueError:
 			return Q
 		
+	# Division is not deferred for lazy brats: the quotient is a brat only if
+	# the numerator of the divisor is a monomial, and otherwise a rational
+	# function is returned, which requires the data of both arguments.
 	def __truediv__(self, other):
+		B = signature_product(self, other, -1)
+		if B is not None:
+			return B
 		if isinstance(other, brat):
 			S = other.rational_function()
 		else:
@@ -811,6 +1826,12 @@ class brat:
 			return Q
 		
 	def __pow__(self, other):
+		if is_pending(self) and other in ZZ and other >= 0:
+			return lazy_operation(operator.pow, self, ZZ(other))
+		if other in ZZ:
+			B = signature_power(self, ZZ(other))
+			if B is not None:
+				return B
 		R = self.rational_function()
 		Q = R**other
 		try:
@@ -865,6 +1886,92 @@ class brat:
 			denominator=expression
 		)
 
+	def coefficient(self, n:int):
+		r"""Returns the coefficient of ``t^n`` in the power series expansion of a univariate ``brat``. The series is not expanded: the algorithm of Bostan and Mori is applied to the numerator and the expanded denominator signature, which takes a logarithmic number of polynomial multiplications in ``n``. This is suitable for very large ``n``. A rational number is its own constant term, and all its other coefficients are zero.
+
+		- ``n``: the exponent.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: F = br.brat(1/((1 - t)*(1 - t^2)*(1 - t^3)))
+			sage: F.coefficient(10)
+			14
+			sage: F.coefficient(10^12)
+			83333333333833333333334
+		"""
+		if self._ring != QQ and len(self._ring.gens()) != 1:
+			raise ValueError("Coefficients can only be extracted from univariate brats.")
+		sig = self._d_sig
+		if self._ring == QQ:
+			if ZZ(n) != 0:
+				return ZZ(0)
+			return ZZ(self._n_poly) if sig["coefficient"] == 1 else self._n_poly/sig["coefficient"]
+		n = ZZ(n) + sig["monomial"][0]
+		if n < 0:
+			return ZZ(0)
+		R = self._ring
+		Q = prod(
+			((1 - R.gen()**v[0])**e for v, e in sig["factors"].items()), R.one()
+		)
+		c = bostan_mori(R(self._n_poly), Q, n)
+		return ZZ(c) if sig["coefficient"] == 1 else c/sig["coefficient"]
+
+	def compile(self, backend:str="numpy", order=None):
+		r"""Returns a function that evaluates the ``brat``. Python code is generated once for the given ``brat``: the numerator as an unrolled nested Horner scheme and the denominator as the product of the factors of its denominator signature, where all powers of the variables are computed once. The function takes the values of the variables as arguments, in the order of ``variables``, and does not use SageMath. At poles, it returns ``inf`` or ``nan``. The generated code is in the attribute ``source`` of the function.
+
+		- ``backend``: either ``"numpy"``, for a function of NumPy arrays (or numbers) with real or complex entries that returns an array, or ``"python"``, for a function of numbers, such as floats, complex numbers, or fractions, that returns a number. Default: ``"numpy"``.
+		- ``order``: the list of variables in the order used for the Horner scheme, starting with the outermost variable. Default: ``None``, which uses the order of ``variables``.
+
+		EXAMPLE::
+
+			sage: x, y = polygens(QQ, 'x,y')
+			sage: F = br.brat((1 + x*y)/((1 - x)*(1 - y)))
+			sage: f = F.compile(backend="python")
+			sage: f(0.5, 0.25)
+			3.0
+			sage: f(1.0, 0.25)
+			inf
+			sage: print(f.source)
+			def brat_function(x0, x1):
+				try:
+					h0 = x1
+					h0 = h0*x0 + 1
+					n = h0
+					d = (1 - x1)*(1 - x0)
+				except (ZeroDivisionError, OverflowError):
+					return nan
+				if d == 0:
+					return nan if n == 0 else inf
+				return n/d
+		"""
+		if self._ring == QQ:
+			gens = []
+			terms = {(): int(self._n_poly)}
+		else:
+			gens = [str(x) for x in self._ring.gens()]
+			terms = {
+				tuple(int(a) for a in e): int(c) 
+				for e, c in poly_dict(self._ring, self._n_poly).items()
+			}
+		if order is not None:
+			order = [str(x) for x in order]
+			if sorted(order) != sorted(gens):
+				raise ValueError("The order must contain each variable once.")
+			order = [gens.index(x) for x in order]
+		sig = self._d_sig
+		f, source = compile_quotient(
+			terms,
+			int(sig["coefficient"]),
+			[int(a) for a in sig["monomial"]],
+			{tuple(int(a) for a in v): int(e) for v, e in sig["factors"].items()},
+			len(gens),
+			backend=backend,
+			order=order,
+		)
+		f.source = source
+		return f
+
 	def denominator(self):
 		r"""Returns the polynomial in the denominator of the rational function.
 
@@ -907,6 +2014,48 @@ class brat:
 		"""
 		return self._d_sig
 
+	def evaluate(self, points):
+		r"""Returns the values of the ``brat`` at the given points. The numerator is evaluated with a nested Horner scheme, and the denominator as the product of the factors of its denominator signature.
+
+		If ``points`` is a NumPy array, the evaluation is carried out with NumPy and an array is returned. Its last axis holds the coordinates of the points, and for univariate ``brat`` objects, it can also just hold the values. At poles, the values are ``inf`` or ``nan``. Otherwise, ``points`` is a list of points, each given as a list of exact values (or just a value for univariate ``brat`` objects), and the list of exact values is returned.
+
+		- ``points``: the points.
+
+		EXAMPLE::
+
+			sage: x, y = polygens(QQ, 'x,y')
+			sage: F = br.brat((1 + x*y)/((1 - x)*(1 - y)))
+			sage: F.evaluate([(1/2, 1/3), (2, 3)])
+			[7/2, 7/2]
+			sage: import numpy
+			sage: F.evaluate(numpy.array([[0.5, 0.25], [0.25, 0.25]]))
+			array([3.        , 1.88888889])
+		"""
+		if self._ring == QQ:
+			k = 0
+			terms = {(): self._n_poly}
+		else:
+			k = len(self._ring.gens())
+			terms = poly_dict(self._ring, self._n_poly)
+		sig = self._d_sig
+		if isinstance(points, numpy.ndarray):
+			return evaluate_arrays(
+				horner_scheme({e: float(c) for e, c in terms.items()}),
+				float(sig["coefficient"]),
+				[int(a) for a in sig["monomial"]],
+				{tuple(int(a) for a in v): int(e) for v, e in sig["factors"].items()},
+				point_columns(points, max(k, 1)),
+			)
+		S = horner_scheme(terms)
+		values = []
+		for p in points:
+			X = list(p) if isinstance(p, (list, tuple)) else [p]
+			X = [QQ(x) if isinstance(x, int) else x for x in X]
+			values.append(evaluate_scheme(S, X)/evaluate_denominator(
+				sig["coefficient"], sig["monomial"], sig["factors"], X
+			))
+		return values
+
 	def factor(self):
 		r"""Returns a new ``brat`` object with the numerator polynomial factored.
 		"""
@@ -914,6 +2063,79 @@ class brat:
 		B._factor = True
 		return B
 
+	@staticmethod
+	def from_bytes(data:bytes):
+		r"""Returns the ``brat`` encoded by ``to_bytes``. The stored data is trusted, so no factorization or verification takes place.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: F = br.brat((1 + t)/(1 - t^3))
+			sage: br.brat.from_bytes(F.to_bytes())
+			(1 + t)/(1 - t^3)
+		"""
+		return brat.from_dict(bytes_to_dict(data))
+
+	@staticmethod
+	def from_dict(data:dict):
+		r"""Returns the ``brat`` given by a dictionary as returned by ``to_dict``. The stored data is trusted, so no factorization or verification takes place.
+
+		EXAMPLE::
+
+			sage: br.brat.from_dict({
+				'variables': ['t'],
+				'numerator': [[0, 1], [1, 1]],
+				'coefficient': 1,
+				'monomial': [0],
+				'factors': [[3, 1]],
+				'type': 'rf'
+			})
+			(1 + t)/(1 - t^3)
+		"""
+		return restore_brat(
+			data,
+			data.get("increasing_order", True),
+			data.get("hide_monomial", True),
+			data.get("factor", False),
+		)
+
+	@staticmethod
+	def from_latex(s:str, variables=None, increasing_order:bool=True, hide_monomial:bool=True):
+		r"""Returns the ``brat`` given by a LaTeX string as returned by ``latex``. The grammar is the same as for ``from_string``, except that products are written by juxtaposition and ``\dfrac{A}{B}`` stands for ``(A)/(B)``. Line breaks of the ``align*`` environment are ignored, so numerators written by ``write_latex`` can also be read.
+
+		- ``variables``: the variables as a list or a polynomial ring. Their LaTeX strings are used to read juxtaposed variables. If ``None``, single letters, possibly with a subscript, and commands such as ``\alpha`` are read as variables and sorted. Default: ``None``.
+		- ``increasing_order``: whether to display polynomials in increasing degree. Default: ``True``.
+		- ``hide_monomial``: whether to absorb the monomial in the denominator into the numerator. Default: ``True``.
+
+		EXAMPLE::
+
+			sage: x, y = polygens(ZZ, 'x,y')
+			sage: F = br.brat(numerator=1 + x*y, denominator=(1 - x)*(1 - y)^2)
+			sage: F.latex()
+			'\\dfrac{1 + xy}{(1 - x)(1 - y)^2}'
+			sage: br.brat.from_latex(F.latex(), variables=[x, y]) == F
+			True
+		"""
+		return string_to_brat(s, True, variables, increasing_order, hide_monomial)
+
+	@staticmethod
+	def from_string(s:str, variables=None, increasing_order:bool=True, hide_monomial:bool=True):
+		r"""Returns the ``brat`` given by a string as returned by ``str``. The numerator is built directly from its terms, and the denominator is read factor by factor into the denominator signature, so it is neither expanded nor factored. Sums, products, integer powers, and parentheses are allowed; factors of the denominator that are not integers, monomials, or of the form ``(1 - M)`` are processed as in the constructor. As in the constructor, the denominator is kept as written, so ``"5/10"`` is not reduced to ``1/2``.
+
+		- ``variables``: the variables as a list or a polynomial ring, which determines the order of the variables. If ``None``, the variables appearing in the string are sorted. Default: ``None``.
+		- ``increasing_order``: whether to display polynomials in increasing degree. Default: ``True``.
+		- ``hide_monomial``: whether to absorb the monomial in the denominator into the numerator. Default: ``True``.
+
+		EXAMPLE::
+
+			sage: F = br.brat.from_string("(1 + 4*q*t + q^2*t^2)/((1 - t)*(1 - q^2*t)^3)")
+			sage: F
+			(1 + 4*q*t + q^2*t^2)/((1 - t)*(1 - q^2*t)^3)
+			sage: F.denominator_signature()
+			{'coefficient': 1, 'monomial': (0, 0), 'factors': {(0, 1): 1, (2, 1): 3}}
+		"""
+		return string_to_brat(s, False, variables, increasing_order, hide_monomial)
+
 	def invert_variables(self, ratio:bool=False):
 		r"""Returns the corresponding ``brat`` after inverting all of the variables and then rewriting the rational function so that all exponents are non-negative. 
 
@@ -960,7 +2182,7 @@ class brat:
 		Additional argument:
 
 		- ``factor``: factor the numerator polynomial. Default: ``False``.
-		- ``split``: if true, returns a pair of strings formatted in LaTeX: the first is the numerator and the second is the denominator. Default: ``False``.
+		- ``split``: if true, returns a pair of strings formatted in LaTeX: the first is the numerator and the second is the denominator, which is ``'1'`` for polynomials. Default: ``False``.
 
 		EXAMPLE::
 
@@ -977,22 +2199,45 @@ class brat:
 			('1 + 2t^2 + 4t^4 + 4t^6 + 2t^8 + t^{10}',
 			'(1 - t)(1 - t^2)(1 - t^3)(1 - t^4)(1 - t^5)')
 		"""
-		if factor:
-			B = self.factor()
-		else:
-			B = self
-		latex_str = remove_unnecessary_braces_and_spaces(brat_to_str(B, True))
+		N, D = self._render(True, factor or self._factor)
 		if split:
-			N, D = latex_str.split('@')
-			N = N[7:-1]
-			D = D[1:-1]
-			return (N, D)
-		return latex_str.replace('@', '')
+			return (N, "1" if D is None else D)
+		return join_parts(N, D, latex=True)
 
 	# Just for SageMath's `pretty_print` function
 	def _latex_(self):
 		return self.latex(factor=self._factor)
 	
+	@staticmethod
+	def map(inputs, processes:int=None, chunksize:int=1, **kwargs) -> list:
+		r"""Returns the list of ``brat`` objects constructed from the given inputs, in order, using a pool of worker processes. Workers send back the numerators and denominator signatures in terms of integers, so no SageMath objects are pickled on the way back. If an input cannot be made into a ``brat``, the raised exception is returned in its place and the remaining inputs are still processed. An exception that cannot be pickled is replaced by a ``RuntimeError`` giving the index of the input and the ``repr`` of the exception.
+
+		- ``inputs``: the inputs, each of which is a rational function, a pair ``(numerator, denominator)``, or a dictionary of keyword arguments for ``brat``.
+		- ``processes``: the number of worker processes. If ``1``, the inputs are processed in this process. Default: ``None``, which uses the number of processors.
+		- ``chunksize``: the number of inputs sent to a worker at a time. Default: ``1``.
+
+		All other keyword arguments are passed to ``brat`` for every input.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: br.brat.map([1/(1 - t), (1 + t, 1 - t^2), 1/(1 - t - t^2)])
+			[1/(1 - t), (1 + t)/(1 - t^2), ValueError('Denominator not in correct form.')]
+		"""
+		from concurrent.futures import ProcessPoolExecutor
+		jobs = [(i, x, kwargs) for i, x in enumerate(inputs)]
+		if processes == 1:
+			results = [construct_data(job) for job in jobs]
+		else:
+			with ProcessPoolExecutor(max_workers=processes) as pool:
+				results = list(pool.map(construct_data, jobs, chunksize=chunksize))
+		increasing_order = kwargs.get("increasing_order", True)
+		hide_monomial = kwargs.get("hide_monomial", True)
+		return [
+			restore_brat(data, increasing_order, hide_monomial) if success else data
+			for success, data in results
+		]
+
 	def numerator(self):
 		r"""Returns the polynomial in the numerator of the rational function as a ``brat``.
 
@@ -1027,6 +2272,51 @@ class brat:
 		B._d_sig["monomial"] = tuple([0]*len(B._ring.gens()))
 		return B
 		
+	@staticmethod
+	def prod(iterable, balanced:bool=False):
+		r"""Returns the product of the given ``brat`` objects (or rational numbers) as a ``brat``. The denominator signatures are combined directly and the product is normalized only once at the end.
+
+		- ``iterable``: the factors of the product.
+		- ``balanced``: multiply the factors pairwise in a balanced binary tree so that intermediate numerators stay small. Default: ``False``.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: br.brat.prod(br.brat(1/(1 - t^i)) for i in range(1, 5))
+			1/((1 - t)*(1 - t^2)*(1 - t^3)*(1 - t^4))
+		"""
+		L = list(iterable)
+		if len(L) == 0:
+			return brat(ZZ(1))
+		data = common_data(L)
+		if data is None:
+			raise ValueError("Factors must be defined over a common polynomial ring.")
+		R, L = data
+		return build_normalized_brat(R, tree_reduce(multiply_data, L, balanced))
+
+	def quasipolynomial(self):
+		r"""Returns the quasi-polynomial of the coefficients of a univariate ``brat``. Since the denominator is a product of factors ``(1 - t^a)^e``, the coefficient of ``t^n`` is, for all but finitely many ``n``, given by one of ``p`` polynomials in ``n`` depending on ``n`` modulo ``p``, where ``p`` is the lcm of the exponents ``a``. The polynomials are interpolated from the first coefficients of the series once and kept with the ``brat``. The returned object can be called with ``n`` to get the coefficient, and it has the attributes ``period`` and ``constituents``. For a rational number, the quasi-polynomial has period 1 and is zero except at ``n = 0``.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: F = br.brat(1/((1 - t)*(1 - t^2)))
+			sage: Q = F.quasipolynomial()
+			sage: Q
+			Quasi-polynomial of period 2 and degree 1
+			sage: Q.constituents
+			[1/2*n + 1, 1/2*n + 1/2]
+			sage: Q(10^20)
+			50000000000000000001
+		"""
+		if self._ring != QQ and len(self._ring.gens()) != 1:
+			raise ValueError("Quasi-polynomials require a univariate brat.")
+		if self.__dict__.get("_quasipolynomial") is None:
+			self._quasipolynomial = compute_quasipolynomial(
+				self._ring, self._n_poly, self._d_sig
+			)
+		return self._quasipolynomial
+
 	def rational_function(self):
 		r"""Returns the reduced rational function. The underlying type of this object is not a ``brat``.
 
@@ -1042,8 +2332,66 @@ class brat:
 			sage: f.rational_function()
 			1/(-x*y^2 + 1) 
 		"""
+		if is_pending(self):
+			return pending_rational_function(self)
 		return self._n_poly / unfold_signature(self._ring, self._d_sig)
 	
+	def series(self, n:int=None, max_degree:int=None, bounds=None):
+		r"""Returns the series expansion of the ``brat``. The numerator is divided by each factor ``(1 - M)^e`` of the denominator signature in turn, as a cumulative sum of the coefficients along the exponent vector of ``M``, so no rational function arithmetic takes place.
+
+		If ``n`` is given, the ``brat`` must be univariate, and the power series up to, but not including, degree ``n`` is returned; the time is linear in ``n`` for each factor. If the denominator has a monomial, a Laurent series is returned. For a rational number, the constant power series in ``t`` is returned.
+
+		Otherwise, the expansion is truncated to the exponent vectors whose total degree is at most ``max_degree`` and whose entries are at most the given ``bounds``, and the dictionary of the nonzero coefficients is returned, with the exponent vectors as keys. The factors of the denominator must have non-negative exponents.
+
+		- ``n``: the precision of a univariate series. Default: ``None``.
+		- ``max_degree``: the largest total degree of the terms. Default: ``None``.
+		- ``bounds``: the list of the largest exponent of each variable, where ``None`` entries are not bounded. Default: ``None``.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: F = br.brat(1/((1 - t)*(1 - t^2)*(1 - t^3)))
+			sage: F.series(10)
+			1 + t + 2*t^2 + 3*t^3 + 4*t^4 + 5*t^5 + 7*t^6 + 8*t^7 + 10*t^8 + 12*t^9 + O(t^10)
+			sage: F.series(10^5).list()[-1]
+			833366667
+			sage: x, y = polygens(QQ, 'x,y')
+			sage: G = br.brat(1/((1 - x)*(1 - x*y)^2))
+			sage: G.series(max_degree=3)
+			{(0, 0): 1, (1, 0): 1, (1, 1): 2, (2, 0): 1, (2, 1): 2, (3, 0): 1}
+			sage: G.series(max_degree=4, bounds=[None, 1])
+			{(0, 0): 1, (1, 0): 1, (1, 1): 2, (2, 0): 1, (2, 1): 2, (3, 0): 1, (3, 1): 2, (4, 0): 1}
+		"""
+		if n is None:
+			if max_degree is None and bounds is None:
+				raise ValueError("Give a precision n or a bound on the degrees.")
+			return series_table(self._ring, self._n_poly, self._d_sig, max_degree, bounds)
+		if self._ring != QQ and len(self._ring.gens()) != 1:
+			raise ValueError("Series expansions with a precision require a univariate brat.")
+		n = ZZ(n)
+		if n < 1:
+			raise ValueError("The precision must be a positive integer.")
+		sig = self._d_sig
+		if self._ring == QQ:
+			c = self._n_poly/sig["coefficient"]
+			return PowerSeriesRing(ZZ if c in ZZ else QQ, "t")(c, prec=n)
+		m = int(sig["monomial"][0])
+		coeffs = univariate_series(
+			{int(k[0]): int(c) for k, c in poly_dict(self._ring, self._n_poly).items()},
+			{int(v[0]): int(e) for v, e in sig["factors"].items()},
+			int(n) + m,
+		)
+		c = sig["coefficient"]
+		name = str(self._ring.gen())
+		P = PowerSeriesRing(ZZ if c == 1 else QQ, name)
+		f = P(coeffs, prec=n + m)
+		if c != 1:
+			f /= c
+		if m == 0:
+			return f
+		L = LaurentSeriesRing(P.base_ring(), name)
+		return L(f).shift(-m)
+
 	def subs(self, S:dict):
 		r"""Given a dictionary of the desired substitutions, return the new ``brat`` obtained by performing the substitutions. 
 
@@ -1068,6 +2416,75 @@ class brat:
 		except ValueError:
 			return Q
 
+	@staticmethod
+	def sum(iterable, balanced:bool=False):
+		r"""Returns the sum of the given ``brat`` objects (or rational numbers) as a ``brat``. The sum is accumulated over a running least common denominator signature, and it is normalized only once at the end.
+
+		- ``iterable``: the summands.
+		- ``balanced``: add the summands pairwise in a balanced binary tree so that intermediate numerators stay small. Default: ``False``.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: br.brat.sum(br.brat(t^i/(1 - t^i)) for i in range(1, 4))
+			(t + t^2 - t^3 - 2*t^4 - 2*t^5 + 3*t^6)/((1 - t)*(1 - t^2)*(1 - t^3))
+		"""
+		L = list(iterable)
+		if len(L) == 0:
+			return brat(ZZ(0))
+		data = common_data(L)
+		if data is None:
+			raise ValueError("Summands must be defined over a common polynomial ring.")
+		R, L = data
+		add = lambda X, Y: add_data(R, X, Y)
+		return build_normalized_brat(R, tree_reduce(add, L, balanced))
+
+	def to_bytes(self) -> bytes:
+		r"""Returns a compact binary encoding of the ``brat``. Exponents are stored as packed arrays of integers and coefficients as variable-length integers. The format is described in the module ``brational.serialize``, which does not need SageMath. Use ``brat.from_bytes`` to recover the ``brat``.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: F = br.brat((1 + t)/(1 - t^3))
+			sage: F.to_bytes()
+			b'BRAT\x01\x0b\x02rf\x01\x01t\x02\x01\x00\x01\x02\x02\x02\x01\x00\x01\x01\x03\x01'
+		"""
+		return dict_to_bytes(self.to_dict())
+
+	def to_dict(self) -> dict:
+		r"""Returns a dictionary of the data of the ``brat`` in terms of integers, strings, and lists, which can be saved as JSON. Use ``brat.from_dict`` to recover the ``brat``. The keys are
+
+		- ``variables``: the list of variable names, or ``None`` for rational numbers,
+		- ``numerator``: the list of terms of the numerator, each given by its exponents followed by its coefficient,
+		- ``coefficient``, ``monomial``, ``factors``: the denominator signature, where each factor is given by its vector followed by its exponent,
+		- ``type``: the kind of expression, as used for printing,
+		- ``increasing_order``, ``hide_monomial``, ``factor``: the display settings.
+
+		Rational numbers that are not integers are given as strings ``"a/b"``.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: F = br.brat((1 + t)/(1 - t^3))
+			sage: F.to_dict()
+			{'variables': ['t'],
+			 'numerator': [[0, 1], [1, 1]],
+			 'coefficient': 1,
+			 'monomial': [0],
+			 'factors': [[3, 1]],
+			 'type': 'rf',
+			 'increasing_order': True,
+			 'hide_monomial': True,
+			 'factor': False}
+		"""
+		if is_pending(self):
+			self._force()
+		data = data_to_dict(self._ring, self._n_poly, self._d_sig, self._type)
+		data["increasing_order"] = self.increasing_order
+		data["hide_monomial"] = self.hide_monomial
+		data["factor"] = self._factor
+		return data
+
 	def variables(self):
 		r"""Returns the polynomial variables used.
 
@@ -1096,7 +2513,7 @@ class brat:
 		) -> None:
 		r"""Writes the ``brat`` object to a file formatted in LaTeX. The (default) output is a displayed equation (using ``\[`` and ``\]``) of the ``brat``. There are many parameters to change the format of the output.
 
-		- ``filename``: the string for the output filename. Default: ``None``, which will output a timestamp name of the form ``%Y-%m-%d_%H-%M-%S.tex``.
+		- ``filename``: the string for the output filename, or a text stream to write to. Default: ``None``, which will output a timestamp name of the form ``%Y-%m-%d_%H-%M-%S.tex``.
 		- ``just_numerator``: write just the numerator. Default: ``False``.
 		- ``just_denominator``: write just the denominator. Default: ``False``.
 		- ``align``: format using the ``align*`` environment. Default: ``False``.
@@ -1119,7 +2536,7 @@ class brat:
 			sage: with open('test.tex', 'r') as out_file:
 			....:     print(out_file.read())
 			\[
-				\dfrac{1 + x y^2}{(1 - x^2y^4)}
+				\dfrac{1 + xy^2}{1 - x^2y^4}
 			\]
 
 			sage: X = polygens(QQ, 'X')[0]
@@ -1143,30 +2560,103 @@ class brat:
 		from datetime import datetime
 		if filename is None:
 			filename = datetime.now().strftime('%Y-%m-%d_%H-%M-%S.tex')
-		if just_numerator and just_denominator:
-			raise ValueError("'just_numerator' and 'just_denominator' cannot both be True.")
-		if line_width < 60:
-			raise ValueError("line width must be at least 60.")
-		if just_numerator:
-			func = self.latex(split=True, factor=factor)[0]
-		elif just_denominator:
-			func = self.latex(split=True, factor=factor)[1]
-		else:
-			func = self.latex(factor=factor)
-		if not function_name is None:
-			if align:
-				function_name = f"{function_name} &= "
-			else:
-				function_name = f"{function_name} = "
-		else:
-			function_name = ""
-		if align:
-			func = format_polynomial_for_align(func, line_width, first=len(function_name))
-			output = f"\\begin{{align*}}\n\t{function_name}{func}\n\\end{{align*}}"
-		else:
-			output = f"\\[\n\t{function_name}{func}\n\\]"
+		check_latex_options(just_numerator, just_denominator, line_width)
+		B = self._with_factor(factor or self._factor)
+		if hasattr(filename, "write"):
+			write_latex_to_stream(
+				filename, B, just_numerator, just_denominator, align, line_width, function_name
+			)
+			return None
 		with open(filename, "w") as f:
-			f.write(output)
+			write_latex_to_stream(
+				f, B, just_numerator, just_denominator, align, line_width, function_name
+			)
+		if save_message:
+			print(f"Output saved to {filename}.")
+		return None
+	
+	@staticmethod
+	def write_latex_many(
+			brats,
+			filename:str=None,
+			names:list=None,
+			just_numerator:bool=False,
+			just_denominator:bool=False,
+			align:bool=False,
+			factor:bool=False,
+			line_width:int=100,
+			processes:int=None,
+			save_message:bool=True
+		) -> None:
+		r"""Writes many ``brat`` objects to one file formatted in LaTeX, one after the other, in the same format as ``write_latex``. The file is opened once and the blocks are written in order.
+
+		- ``brats``: the ``brat`` objects (or rational functions) to write.
+		- ``filename``: the string for the output filename, or a text stream to write to. Default: ``None``, which will output a timestamp name of the form ``%Y-%m-%d_%H-%M-%S.tex``.
+		- ``names``: the function names, one for each ``brat``, each of which can be ``None``. Default: ``None``.
+		- ``processes``: the number of worker processes used to format the ``brat`` objects. Default: ``None``, which formats them in this process and writes each numerator term by term.
+
+		The remaining arguments are as in ``write_latex`` and apply to every ``brat``.
+
+		EXAMPLE::
+
+			sage: t = polygens(QQ, 't')[0]
+			sage: F = [br.brat(1/(1 - t^i)) for i in range(1, 4)]
+			sage: br.brat.write_latex_many(F, "many.tex", names=[f"F_{i}" for i in range(1, 4)])
+			Output saved to many.tex.
+			sage: with open("many.tex", "r") as output:
+			....:     print(output.read())
+			\[
+				F_1 = \dfrac{1}{1 - t}
+			\]
+			\[
+				F_2 = \dfrac{1}{1 - t^2}
+			\]
+			\[
+				F_3 = \dfrac{1}{1 - t^3}
+			\]
+		"""
+		from datetime import datetime
+		from concurrent.futures import ProcessPoolExecutor
+		if filename is None:
+			filename = datetime.now().strftime('%Y-%m-%d_%H-%M-%S.tex')
+		check_latex_options(just_numerator, just_denominator, line_width)
+		brats = [B if isinstance(B, brat) else brat(B) for B in brats]
+		if names is None:
+			names = [None]*len(brats)
+		names = list(names)
+		if len(names) != len(brats):
+			raise ValueError("Number of names must match the number of brats.")
+		jobs = [
+			(B, name, just_numerator, just_denominator, align, factor, line_width)
+			for B, name in zip(brats, names)
+		]
+
+		def write_all(stream):
+			if processes is None:
+				for i, (B, name, *_) in enumerate(jobs):
+					if i > 0:
+						stream.write("\n")
+					write_latex_to_stream(
+						stream, 
+						B._with_factor(factor or B._factor), 
+						just_numerator, 
+						just_denominator, 
+						align, 
+						line_width, 
+						name,
+					)
+				return None
+			with ProcessPoolExecutor(max_workers=processes) as pool:
+				for i, block in enumerate(pool.map(latex_block, jobs)):
+					if i > 0:
+						stream.write("\n")
+					stream.write(block)
+		
+		if hasattr(filename, "write"):
+			write_all(filename)
+			return None
+		with open(filename, "w") as f:
+			write_all(f)
 		if save_message:
 			print(f"Output saved to {filename}.")
 		return None
@@ -1178,6 +2668,30 @@ def deep_sig_copy(sig:dict) -> dict:
 		"factors": {k: v for k, v in sig["factors"].items()},
 	}
 
+# Given the polynomial ring R, a numerator N in R, and a denominator signature
+# sig, construct the brat directly without processing the input.
+def build_brat(R, N, sig:dict, increasing_order:bool=True, hide_monomial:bool=True) -> brat:
+	B = brat.__new__(brat)
+	B._ring = R
+	B._n_poly = N
+	B._d_sig = sig
+	B._type = get_brat_type(R, N, sig)
+	B.increasing_order = increasing_order
+	B.hide_monomial = hide_monomial
+	B._factor = False
+	return B
+
+# Given the output of data_to_dict and the display settings, return the brat
+# without processing the input.
+def restore_brat(data:dict, increasing_order:bool=True, hide_monomial:bool=True, factor:bool=False) -> brat:
+	B = brat.__new__(brat)
+	B._ring, B._n_poly, B._d_sig, B._type = data_from_dict(data)
+	B.increasing_order = increasing_order
+	B.hide_monomial = hide_monomial
+	B._factor = factor
+	B._pending = None
+	return B
+
 def deep_brat_copy(B:brat) -> brat:
 	B_new = brat(
 		numerator=B._n_poly, 
@@ -0,0 +1,149 @@
+#
+#   Copyright 2024--2025 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+# The disk cache currently consulted by the brat constructor, if any.
+_ACTIVE = None
+
+# Given the input to the brat constructor, return a hexadecimal digest that
+# only depends on how the input prints, on the parents of its parts, and on the
+# verification mode, so that data built without a check is not returned when a
+# check is asked for.
+def input_key(num, dem, sig, fix:bool, verify:str="exact") -> str:
+	def describe(x):
+		if x is None:
+			return None
+		if isinstance(x, (list, tuple)):
+			return [describe(y) for y in x]
+		try:
+			return [str(x.parent()), str(x)]
+		except AttributeError:
+			return [type(x).__name__, str(x)]
+	if sig is not None:
+		sig = [
+			str(sig.get("coefficient")),
+			str(sig.get("monomial")),
+			str(sig.get("factors")),
+		]
+	data = json.dumps([describe(num), describe(dem), sig, bool(fix), str(verify)])
+	return hashlib.sha256(data.encode()).hexdigest()
+
+class DiskCache:
+	r"""
+	A cache stored in an SQLite database that maps inputs of the brat
+	constructor to the processed data. Entries are stored as JSON in terms of
+	integers and strings.
+
+	- ``filename``: the path of the database file; it is created if it does not exist.
+
+	- ``timeout``: the number of seconds to wait for a locked database (default: ``30.0``).
+	"""
+
+	def __init__(self, filename:str, timeout:float=30.0):
+		self.filename = str(filename)
+		self.timeout = timeout
+		self.hits = 0
+		self.misses = 0
+		self._previous = []
+		self._lock = threading.Lock()
+		self._conn = None
+		self._pid = None
+		self._connect()
+
+	def __enter__(self):
+		global _ACTIVE
+		self._previous.append(_ACTIVE)
+		_ACTIVE = self
+		return self
+
+	def __exit__(self, *args):
+		global _ACTIVE
+		_ACTIVE = self._previous.pop()
+		return False
+
+	def __len__(self) -> int:
+		with self._lock:
+			row = self._connect().execute("SELECT COUNT(*) FROM brats").fetchone()
+		return row[0]
+
+	def _connect(self):
+		# Connections are not shared with forked processes.
+		if self._conn is None or self._pid != os.getpid():
+			self._conn = sqlite3.connect(
+				self.filename,
+				timeout=self.timeout,
+				check_same_thread=False,
+			)
+			self._conn.execute("PRAGMA journal_mode=WAL")
+			self._conn.execute(
+				"CREATE TABLE IF NOT EXISTS brats (key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+			)
+			self._conn.commit()
+			self._pid = os.getpid()
+		return self._conn
+
+	def clear(self):
+		with self._lock:
+			conn = self._connect()
+			conn.execute("DELETE FROM brats")
+			conn.commit()
+		self.hits = 0
+		self.misses = 0
+
+	def close(self):
+		if self._conn is not None and self._pid == os.getpid():
+			self._conn.close()
+		self._conn = None
+
+	def get(self, key:str):
+		with self._lock:
+			row = self._connect().execute(
+				"SELECT data FROM brats WHERE key = ?", (key,)
+			).fetchone()
+		if row is None:
+			self.misses += 1
+			return None
+		self.hits += 1
+		return json.loads(row[0])
+
+	def info(self) -> dict:
+		return {
+			"hits": self.hits,
+			"misses": self.misses,
+			"size": len(self),
+			"filename": self.filename,
+		}
+
+	def put(self, key:str, data:dict):
+		with self._lock:
+			conn = self._connect()
+			conn.execute(
+				"INSERT OR IGNORE INTO brats (key, data) VALUES (?, ?)",
+				(key, json.dumps(data, separators=(",", ":"))),
+			)
+			conn.commit()
+
+# Return the disk cache consulted by the brat constructor, or None.
+def get_disk_cache():
+	return _ACTIVE
+
+# Given a filename, a DiskCache, or None, set the disk cache consulted by the
+# brat constructor and return it.
+def set_disk_cache(cache):
+	global _ACTIVE
+	if cache is not None and not isinstance(cache, DiskCache):
+		cache = DiskCache(cache)
+	_ACTIVE = cache
+	return cache
+
+# Given a filename, return a DiskCache to be used as a context manager.
+def disk_cache(filename:str, timeout:float=30.0) -> DiskCache:
+	return DiskCache(filename, timeout=timeout)
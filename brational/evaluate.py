@@ -0,0 +1,201 @@
+#
+#   Copyright 2024--2025 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Evaluation of numerators and denominator signatures at points. This module
+# does not depend on SageMath, and the functions work with scalars as well as
+# NumPy arrays holding the values of each variable.
+#
+# A polynomial is evaluated with a nested Horner scheme: with respect to the
+# first variable x, it is sum_j x^j Q_j, where the Q_j are polynomials in the
+# remaining variables, and it is evaluated as
+#   (...(Q_J x^(J - J') + Q_J') x^(J' - J'') + ...) x^(j_min).
+
+import numpy
+
+# The number of points evaluated at a time, so that intermediate arrays stay in
+# the cache.
+CHUNK = 2**14
+
+# Given a value x and a positive integer e, return x^e.
+def power(x, e:int):
+	return x if e == 1 else x**e
+
+# Given a dictionary of exponent tuples and coefficients, and the index i of the
+# first variable to consider, return the Horner scheme of the polynomial. A
+# scheme is either a coefficient or a pair (i, parts), where parts is the list
+# of pairs (j, scheme of Q_j) with decreasing j.
+def horner_scheme(terms:dict, i:int=0):
+	if len(terms) == 0:
+		return 0
+	if len(next(iter(terms))) == i:
+		return next(iter(terms.values()))
+	groups = {}
+	for e, c in terms.items():
+		groups.setdefault(e[i], {})[e] = c
+	parts = [(j, horner_scheme(groups[j], i + 1)) for j in sorted(groups, reverse=True)]
+	return (i, parts)
+
+# Given a Horner scheme and the list of values of the variables, return the value
+# of the polynomial.
+def evaluate_scheme(S, X:list):
+	if not isinstance(S, tuple):
+		return S
+	i, parts = S
+	x = X[i]
+	value = evaluate_scheme(parts[0][1], X)
+	for (j, _), (k, Q) in zip(parts, parts[1:]):
+		value = value*power(x, j - k) + evaluate_scheme(Q, X)
+	if parts[-1][0] > 0:
+		value = value*power(x, parts[-1][0])
+	return value
+
+# Given the coefficient, the monomial, and the factors {v: e} of a denominator
+# signature, and the list of values of the variables, return the value of the
+# denominator.
+def evaluate_denominator(c, m, factors:dict, X:list):
+	value = c
+	for x, a in zip(X, m):
+		if a != 0:
+			value = value*power(x, a)
+	for v, e in factors.items():
+		M = 1
+		for x, a in zip(X, v):
+			if a != 0:
+				M = M*power(x, a)
+		value = value*power(1 - M, e)
+	return value
+
+# Given a Horner scheme of a numerator, the coefficient, the monomial, and the
+# factors of a denominator signature, and the list of arrays of values of the
+# variables, all of the same shape, return the array of values of the quotient.
+# At poles, the values are inf or nan.
+def evaluate_arrays(S, c, m, factors:dict, X:list):
+	shape = X[0].shape
+	X = [numpy.ascontiguousarray(x).reshape(-1) for x in X]
+	out = numpy.empty(len(X[0]), dtype=numpy.result_type(*X, float))
+	with numpy.errstate(divide="ignore", invalid="ignore", over="ignore"):
+		for i in range(0, len(out), CHUNK):
+			Y = [x[i:i + CHUNK] for x in X]
+			out[i:i + CHUNK] = evaluate_scheme(S, Y)/evaluate_denominator(c, m, factors, Y)
+	return out.reshape(shape)
+
+# Given a NumPy array or a value, return it as a NumPy array with a floating
+# point or complex type.
+def as_array(x):
+	x = numpy.asarray(x)
+	if x.dtype.kind in "biuO":
+		try:
+			return x.astype(float)
+		except (TypeError, ValueError):
+			return x.astype(complex)
+	return x
+
+# Writes the lines of code of a function that evaluates a quotient of a
+# polynomial and a denominator signature. Powers of the variables are computed
+# once at the start, and the Horner scheme of the numerator is unrolled into
+# assignments.
+class FunctionWriter:
+
+	def __init__(self, k:int, literal):
+		self.names = [f"x{i}" for i in range(k)]
+		self.literal = literal
+		self.lines = []
+		self.powers = set()
+		self.temps = 0
+
+	def power(self, i:int, e:int) -> str:
+		if e == 1:
+			return self.names[i]
+		self.powers.add((self.names[i], e))
+		return f"{self.names[i]}_{e}".replace("-", "m")
+
+	# Returns an expression for the Horner scheme S, which is either a product
+	# or the name of a variable holding the value.
+	def numerator(self, S) -> str:
+		if not isinstance(S, tuple):
+			return self.literal(S)
+		i, parts = S
+		if len(parts) == 1:
+			j, Q = parts[0]
+			q = self.numerator(Q)
+			return q if j == 0 else self.product(q, self.power(i, j))
+		t = f"h{self.temps}"
+		self.temps += 1
+		self.lines.append(f"{t} = {self.numerator(parts[0][1])}")
+		for (j, _), (k, Q) in zip(parts, parts[1:]):
+			q = self.numerator(Q)
+			self.lines.append(f"{t} = {t}*{self.power(i, j - k)} + {q}")
+		if parts[-1][0] > 0:
+			self.lines.append(f"{t} = {t}*{self.power(i, parts[-1][0])}")
+		return t
+
+	def product(self, a:str, b:str) -> str:
+		return b if a == self.literal(1) else f"{a}*{b}"
+
+	def denominator(self, c, m, factors:dict) -> str:
+		strings = [self.literal(c)] if c != 1 else []
+		strings += [self.power(i, a) for i, a in enumerate(m) if a != 0]
+		for v, e in factors.items():
+			M = "*".join(self.power(i, a) for i, a in enumerate(v) if a != 0)
+			strings.append(f"(1 - {M})" + (f"**{e}" if e != 1 else ""))
+		return "*".join(strings) if strings else self.literal(1)
+
+	def power_lines(self) -> list:
+		return [
+			f"{x}_{e} = {x}**{e}".replace("_-", "_m")
+			for x, e in sorted(self.powers)
+		]
+
+# Given a dictionary of exponent tuples and coefficients of a numerator, the
+# coefficient, the monomial, and the factors of a denominator signature, the
+# number k of variables, the backend "numpy" or "python", and the order of the
+# variables for the Horner scheme as a list of indices (or None), return the
+# function of k values that evaluates the quotient, together with its source
+# code. At poles, the function returns inf or nan.
+def compile_quotient(terms:dict, c, m, factors:dict, k:int, backend:str="numpy", order=None) -> tuple:
+	if order is None:
+		order = list(range(k))
+	if backend == "numpy":
+		literal = lambda a: repr(float(a))
+	elif backend == "python":
+		literal = lambda a: repr(int(a))
+	else:
+		raise ValueError("Backend must be 'numpy' or 'python'.")
+	writer = FunctionWriter(k, literal)
+	# The Horner scheme is built with the variables in the given order.
+	writer.names = [f"x{i}" for i in order]
+	N = writer.numerator(horner_scheme({
+		tuple(e[i] for i in order): a for e, a in terms.items()
+	}))
+	writer.names = [f"x{i}" for i in range(k)]
+	D = writer.denominator(c, m, factors)
+	body = writer.power_lines() + writer.lines + [f"n = {N}", f"d = {D}"]
+	args = ", ".join(writer.names)
+	if backend == "numpy":
+		lines = [f"def brat_function({args}):"]
+		lines += [f"\t{x} = as_array({x})" for x in writer.names]
+		lines += ["\twith errstate(divide='ignore', invalid='ignore', over='ignore'):"]
+		lines += [f"\t\t{line}" for line in body]
+		lines += ["\t\treturn n/d"]
+	else:
+		lines = [f"def brat_function({args}):", "\ttry:"]
+		lines += [f"\t\t{line}" for line in body]
+		lines += [
+			"\texcept (ZeroDivisionError, OverflowError):",
+			"\t\treturn nan",
+			"\tif d == 0:",
+			"\t\treturn nan if n == 0 else inf",
+			"\treturn n/d",
+		]
+	source = "\n".join(lines) + "\n"
+	namespace = {
+		"as_array": as_array,
+		"errstate": numpy.errstate,
+		"inf": float("inf"),
+		"nan": float("nan"),
+	}
+	exec(source, namespace)
+	return (namespace["brat_function"], source)
@@ -0,0 +1,291 @@
+#
+#   Copyright 2024--2025 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Parsing of the plaintext and LaTeX strings of brats. This module does not
+# depend on SageMath.
+#
+# The grammar is that of the printed output: a numerator, possibly followed by
+# "/" and a denominator, or \dfrac{numerator}{denominator} in LaTeX. Sums, signs,
+# products (with "*" or juxtaposition), integer powers, and parentheses are
+# allowed. The numerator is expanded into a dictionary of exponent tuples, while
+# the denominator is read factor by factor into a coefficient, a monomial, and
+# factors (1 - X^v) without being expanded.
+
+import re
+
+PLAIN_TOKENS = re.compile(r"\s*(?:(\d+)|([A-Za-z_][A-Za-z0-9_]*)|(\S))")
+LATEX_NAME = r"(?:\\mathit\{[^{}]*\}|\\[A-Za-z]+|[A-Za-z])(?:_(?:\{[^{}]*\}|[A-Za-z0-9]))?"
+LATEX_IGNORED = re.compile(r"\\left|\\right|\\quad|\\qquad|\\[,;!]|\\\\|&")
+
+# Given a LaTeX string of a variable, return the name used when no variables
+# are given.
+def latex_to_name(s:str) -> str:
+	s = re.sub(r"\\mathit\{([^{}]*)\}", r"\1", s)
+	return re.sub(r"[\\{}]", "", s)
+
+# Given a string, a latex flag, and the LaTeX strings of known variables (or
+# None), return the list of tokens. Tokens are pairs (kind, value), where kind
+# is "num", "name", or the symbol itself.
+def tokenize(s:str, latex:bool=False, known=None) -> list:
+	if not latex:
+		tokens = []
+		for m in PLAIN_TOKENS.finditer(s):
+			num, name, sym = m.groups()
+			if num is not None:
+				tokens.append(("num", int(num)))
+			elif name is not None:
+				tokens.append(("name", name))
+			elif sym is not None:
+				tokens.append((sym, sym))
+		return tokens
+	s = LATEX_IGNORED.sub(" ", s)
+	names = LATEX_NAME
+	if known:
+		known = sorted(known, key=len, reverse=True)
+		names = "|".join(re.escape(x) for x in known) + "|" + LATEX_NAME
+	pattern = re.compile(
+		r"\s*(?:(\\d?frac|\\tfrac)|(\\cdot)|(\d+)|(" + names + r")|(\S))"
+	)
+	tokens = []
+	for m in pattern.finditer(s):
+		frac, cdot, num, name, sym = m.groups()
+		if frac is not None:
+			tokens.append(("frac", frac))
+		elif cdot is not None:
+			tokens.append(("*", "*"))
+		elif num is not None:
+			tokens.append(("num", int(num)))
+		elif name is not None:
+			tokens.append(("name", name))
+		elif sym is not None:
+			tokens.append((sym, sym))
+	return tokens
+
+class Parser:
+	r"""
+	Recursive descent parser for the strings of brats. Sums are lists of pairs
+	(sign, term), terms are lists of pairs (atom, exponent), and atoms are
+	pairs ("num", n), ("name", x), or ("sum", terms).
+	"""
+
+	OPEN = {"(": ")", "{": "}"}
+
+	def __init__(self, tokens:list):
+		self.tokens = tokens
+		self.pos = 0
+		self.names = {}
+
+	def peek(self):
+		if self.pos < len(self.tokens):
+			return self.tokens[self.pos][0]
+		return None
+
+	def next(self):
+		if self.pos >= len(self.tokens):
+			raise ValueError("Unexpected end of string.")
+		self.pos += 1
+		return self.tokens[self.pos - 1]
+
+	def expect(self, kind:str):
+		token = self.next()
+		if token[0] != kind:
+			raise ValueError(f"Expected '{kind}' but found '{token[1]}'.")
+		return token
+
+	def parse(self) -> tuple:
+		if self.peek() == "frac":
+			self.next()
+			self.expect("{")
+			numer = self.parse_sum()
+			self.expect("}")
+			self.expect("{")
+			denom = [(("sum", self.parse_sum()), 1)]
+			self.expect("}")
+		else:
+			numer = self.parse_sum()
+			denom = None
+			if self.peek() == "/":
+				if len(numer) != 1:
+					raise ValueError("Only a single term can be divided.")
+				self.next()
+				denom = self.parse_term()
+		if self.peek() is not None:
+			raise ValueError(f"Unexpected '{self.tokens[self.pos][1]}'.")
+		return (numer, denom)
+
+	def parse_sum(self) -> list:
+		sign = 1
+		while self.peek() in ("+", "-"):
+			if self.next()[0] == "-":
+				sign = -sign
+		terms = [(sign, self.parse_term())]
+		while self.peek() in ("+", "-"):
+			sign = 1 if self.next()[0] == "+" else -1
+			terms.append((sign, self.parse_term()))
+		return terms
+
+	def parse_term(self) -> list:
+		factors = [self.parse_power()]
+		while True:
+			if self.peek() == "*":
+				self.next()
+			elif not self.peek() in ("num", "name", "(", "{"):
+				return factors
+			factors.append(self.parse_power())
+
+	def parse_power(self) -> tuple:
+		atom = self.parse_atom()
+		if self.peek() != "^":
+			return (atom, 1)
+		self.next()
+		close = None
+		if self.peek() in self.OPEN:
+			close = self.OPEN[self.next()[0]]
+		sign = 1
+		if self.peek() == "-":
+			self.next()
+			sign = -1
+		e = sign*self.expect("num")[1]
+		if close is not None:
+			self.expect(close)
+		return (atom, e)
+
+	def parse_atom(self) -> tuple:
+		kind, value = self.next()
+		if kind == "num":
+			return ("num", value)
+		if kind == "name":
+			self.names.setdefault(value, len(self.names))
+			return ("name", value)
+		if kind in self.OPEN:
+			terms = self.parse_sum()
+			self.expect(self.OPEN[kind])
+			return ("sum", terms)
+		raise ValueError(f"Unexpected '{value}'.")
+
+# Given two dictionaries of exponent tuples and coefficients, return the
+# dictionary of their product.
+def multiply_dicts(A:dict, B:dict) -> dict:
+	C = {}
+	for a, c in A.items():
+		for b, d in B.items():
+			k = tuple(x + y for x, y in zip(a, b))
+			C[k] = C.get(k, 0) + c*d
+	return {k: c for k, c in C.items() if c != 0}
+
+# Given a sum from the Parser, the dictionary of variable indices, and the
+# number of variables, return the expanded dictionary of exponent tuples and
+# coefficients.
+def expand_sum(terms:list, index:dict, n:int) -> dict:
+	result = {}
+	for sign, factors in terms:
+		c = sign
+		exps = [0]*n
+		polys = []
+		for (kind, value), e in factors:
+			if kind == "name":
+				exps[index[value]] += e
+			elif e < 0:
+				raise ValueError("Negative powers are only allowed for variables.")
+			elif kind == "num":
+				c *= value**e
+			else:
+				polys.append((expand_sum(value, index, n), e))
+		term = {tuple(exps): c}
+		for f, e in polys:
+			for _ in range(e):
+				term = multiply_dicts(term, f)
+		for k, a in term.items():
+			result[k] = result.get(k, 0) + a
+	return {k: c for k, c in result.items() if c != 0}
+
+# Given a term from the Parser, the dictionary of variable indices, the number
+# of variables, and an exponent, read the term raised to the exponent as a
+# denominator. Returns the tuple (c, m, factors, residual) of the coefficient,
+# the monomial, the factors (1 - X^v), and the list of other factors as pairs of
+# dictionaries and exponents.
+def read_denominator(factors:list, index:dict, n:int, power:int=1) -> tuple:
+	c = 1
+	m = [0]*n
+	sig_factors = {}
+	residual = []
+	for (kind, value), e in factors:
+		e *= power
+		if kind == "name":
+			m[index[value]] += e
+			continue
+		if kind == "num":
+			if e < 0:
+				raise ValueError("Negative powers are only allowed for variables.")
+			c *= value**e
+			continue
+		if len(value) == 1:
+			sign, inner = value[0]
+			c_in, m_in, f_in, r_in = read_denominator(inner, index, n, e)
+			c *= sign**(e % 2)*c_in
+			m = [a + b for a, b in zip(m, m_in)]
+			for v, k in f_in.items():
+				sig_factors[v] = sig_factors.get(v, 0) + k
+			residual += r_in
+			continue
+		f = expand_sum(value, index, n)
+		zero = tuple([0]*n)
+		if len(f) == 2 and f.get(zero) in (1, -1):
+			v = next(k for k in f if k != zero)
+			if f[v] == -f[zero]:
+				c *= f[zero]**(e % 2)
+				sig_factors[v] = sig_factors.get(v, 0) + e
+				continue
+		residual.append((f, e))
+	return (c, m, sig_factors, residual)
+
+# Given the string of a brat, a latex flag, the list of variable names (or
+# None), and the list of their strings as they appear (or None), return a
+# dictionary with the variables, the numerator as a dictionary of exponent
+# tuples with non-negative entries, and the coefficient, monomial, factors, and
+# residual factors of the denominator. Without given variables, the variables
+# are the names that appear, sorted.
+def parse_brat(s:str, latex:bool=False, names=None, display=None) -> dict:
+	if names is not None and display is None:
+		display = names
+	P = Parser(tokenize(s, latex=latex, known=display if latex else None))
+	numer, denom = P.parse()
+	if names is None:
+		found = list(P.names)
+		if latex:
+			names = sorted(set(latex_to_name(x) for x in found))
+			index = {x: names.index(latex_to_name(x)) for x in found}
+		else:
+			names = sorted(found)
+			index = {x: names.index(x) for x in found}
+	else:
+		position = {x: i for i, x in enumerate(display)}
+		index = {}
+		for x in P.names:
+			if not x in position:
+				raise ValueError(f"Unknown variable '{x}'.")
+			index[x] = position[x]
+	n = len(names)
+	N = expand_sum(numer, index, n)
+	if denom is None:
+		c, m, factors, residual = (1, [0]*n, {}, [])
+	else:
+		c, m, factors, residual = read_denominator(denom, index, n)
+	if any(not any(v) for v in factors):
+		raise ValueError("Denominator is zero.")
+	# Move negative exponents of the numerator to the denominator monomial.
+	shift = [min([0] + [k[i] for k in N]) for i in range(n)]
+	if any(shift):
+		N = {tuple(a - b for a, b in zip(k, shift)): a for k, a in N.items()}
+		m = [a - b for a, b in zip(m, shift)]
+	return {
+		"variables": names,
+		"numerator": N,
+		"coefficient": c,
+		"monomial": m,
+		"factors": factors,
+		"residual": residual,
+	}
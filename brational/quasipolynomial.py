@@ -0,0 +1,56 @@
+#
+#   Copyright 2024--2025 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+class QuasiPolynomial:
+	r"""
+	A function n -> a_n given by polynomials f_0, ..., f_{p-1}, called the
+	constituents, such that a_n = f_r(n) whenever n = r mod p and n is at least
+	``start``. Values for smaller n are stored separately, and values below
+	``low`` are zero.
+
+	- ``period``: the period p.
+
+	- ``constituents``: the list of the p constituents as polynomials.
+
+	- ``start``: the first n where the constituents apply.
+
+	- ``exceptions``: the dictionary of the values a_n for low <= n < start.
+
+	- ``low``: the first n where a_n may be nonzero.
+	"""
+
+	def __init__(self, period:int, constituents:list, start:int, exceptions:dict, low:int):
+		self.period = period
+		self.constituents = constituents
+		self.start = start
+		self.exceptions = exceptions
+		self.low = low
+		self._zero = 0*constituents[0](0)
+		# Each constituent is kept as integer coefficients, highest degree
+		# first, and the reciprocal of their common denominator.
+		self._coefficients = []
+		self._scales = []
+		for f in constituents:
+			L = f.denominator()
+			self._coefficients.append([int(c*L) for c in reversed(f.list())])
+			self._scales.append((self._zero + 1)/L)
+
+	def __call__(self, n):
+		if n >= self.start:
+			r = n % self.period
+			value = 0
+			for c in self._coefficients[r]:
+				value = value*n + c
+			return value*self._scales[r]
+		if n < self.low:
+			return self._zero
+		return self.exceptions[n]
+
+	def __repr__(self) -> str:
+		return f"Quasi-polynomial of period {self.period} and degree {self.degree()}"
+
+	def degree(self) -> int:
+		return max(f.degree() for f in self.constituents)
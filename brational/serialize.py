@@ -0,0 +1,194 @@
+#
+#   Copyright 2024--2025 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Binary encoding of the dictionaries returned by brat.to_dict. This module
+# does not depend on SageMath.
+#
+# All integers are unsigned LEB128 varints unless they are called signed, in
+# which case they are zigzag encoded first. An exponent block of k integers is
+# empty if k = 0, and otherwise it is a byte w in {1, 2, 4, 8} followed by k
+# signed little-endian integers of w bytes each.
+#
+#   b"BRAT", version byte (1), flag byte
+#       bit 0: increasing_order, bit 1: hide_monomial, bit 2: factor,
+#       bit 3: polynomial ring (otherwise the rationals), bit 4: some
+#       coefficients are not integers
+#   type: varint length and ASCII string
+#   variables: varint n, then n times a varint length and UTF-8 string
+#   numerator: varint t, exponent block of t*n integers, t signed numerators of
+#       the coefficients, and if bit 4 is set, t denominators
+#   coefficient: signed numerator, and if bit 4 is set, the denominator
+#   monomial: varint m, exponent block of m integers
+#   factors: varint f, exponent block of f*m integers, f exponents
+#
+# The length m of the monomial is written, since it need not agree with the
+# number n of variables for brats over the rationals.
+
+import sys
+from array import array
+
+MAGIC = b"BRAT"
+VERSION = 1
+WIDTHS = {1: "b", 2: "h", 4: "i", 8: "q"}
+
+# Given an int or a string "a/b", return the pair of integers (a, b).
+def split_number(c) -> tuple:
+	if isinstance(c, int):
+		return (c, 1)
+	a, _, b = str(c).partition("/")
+	return (int(a), int(b) if b else 1)
+
+# Given a pair of integers (a, b), return a if b = 1 and the string "a/b"
+# otherwise.
+def join_number(a:int, b:int):
+	return a if b == 1 else f"{a}/{b}"
+
+def write_varint(out:bytearray, n:int):
+	while n > 0x7F:
+		out.append((n & 0x7F) | 0x80)
+		n >>= 7
+	out.append(n)
+
+def read_varint(data, pos:int) -> tuple:
+	n = 0
+	shift = 0
+	while True:
+		b = data[pos]
+		pos += 1
+		n |= (b & 0x7F) << shift
+		if b < 0x80:
+			return (n, pos)
+		shift += 7
+
+def write_signed(out:bytearray, n:int):
+	write_varint(out, 2*n if n >= 0 else -2*n - 1)
+
+def read_signed(data, pos:int) -> tuple:
+	n, pos = read_varint(data, pos)
+	return (n >> 1 if n % 2 == 0 else -(n >> 1) - 1, pos)
+
+def write_string(out:bytearray, s:str):
+	b = s.encode("utf-8")
+	write_varint(out, len(b))
+	out += b
+
+def read_string(data, pos:int) -> tuple:
+	k, pos = read_varint(data, pos)
+	return (bytes(data[pos:pos + k]).decode("utf-8"), pos + k)
+
+def write_block(out:bytearray, L:list):
+	if len(L) == 0:
+		return
+	m = max(max(L), -min(L) - 1)
+	w = next(w for w in WIDTHS if m < 2**(8*w - 1))
+	A = array(WIDTHS[w], L)
+	if A.itemsize != w:
+		raise ValueError(f"No array type with {w} bytes.")
+	if sys.byteorder == "big":
+		A.byteswap()
+	out.append(w)
+	out += A.tobytes()
+
+def read_block(data, pos:int, k:int) -> tuple:
+	if k == 0:
+		return ([], pos)
+	w = data[pos]
+	A = array(WIDTHS[w])
+	A.frombytes(bytes(data[pos + 1:pos + 1 + k*w]))
+	if sys.byteorder == "big":
+		A.byteswap()
+	return (A.tolist(), pos + 1 + k*w)
+
+# Given a dictionary as returned by brat.to_dict, return its binary encoding.
+def dict_to_bytes(d:dict) -> bytes:
+	varbs = d["variables"]
+	n = 0 if varbs is None else len(varbs)
+	numer = [split_number(t[-1]) for t in d["numerator"]]
+	coeff = split_number(d["coefficient"])
+	rational = coeff[1] != 1 or any(b != 1 for _, b in numer)
+	flags = (
+		int(d.get("increasing_order", True))
+		| int(d.get("hide_monomial", True)) << 1
+		| int(d.get("factor", False)) << 2
+		| int(varbs is not None) << 3
+		| int(rational) << 4
+	)
+	out = bytearray(MAGIC)
+	out.append(VERSION)
+	out.append(flags)
+	write_string(out, d["type"])
+	write_varint(out, n)
+	for x in varbs or []:
+		write_string(out, x)
+	write_varint(out, len(numer))
+	write_block(out, [a for t in d["numerator"] for a in t[:-1]])
+	for a, _ in numer:
+		write_signed(out, a)
+	if rational:
+		for _, b in numer:
+			write_varint(out, b)
+	write_signed(out, coeff[0])
+	if rational:
+		write_varint(out, coeff[1])
+	write_varint(out, len(d["monomial"]))
+	write_block(out, list(d["monomial"]))
+	write_varint(out, len(d["factors"]))
+	write_block(out, [a for t in d["factors"] for a in t[:-1]])
+	for t in d["factors"]:
+		write_varint(out, t[-1])
+	return bytes(out)
+
+# Given the output of dict_to_bytes, return the dictionary.
+def bytes_to_dict(data) -> dict:
+	data = memoryview(data)
+	if bytes(data[:4]) != MAGIC:
+		raise ValueError("Data is not an encoded brat.")
+	if data[4] != VERSION:
+		raise ValueError(f"Unsupported version {data[4]}.")
+	flags = data[5]
+	rational = bool(flags & 16)
+	br_type, pos = read_string(data, 6)
+	n, pos = read_varint(data, pos)
+	varbs = []
+	for _ in range(n):
+		x, pos = read_string(data, pos)
+		varbs.append(x)
+	t, pos = read_varint(data, pos)
+	exps, pos = read_block(data, pos, t*n)
+	nums = []
+	for _ in range(t):
+		a, pos = read_signed(data, pos)
+		nums.append(a)
+	dens = [1]*t
+	if rational:
+		for i in range(t):
+			dens[i], pos = read_varint(data, pos)
+	c, pos = read_signed(data, pos)
+	c_den = 1
+	if rational:
+		c_den, pos = read_varint(data, pos)
+	m, pos = read_varint(data, pos)
+	mono, pos = read_block(data, pos, m)
+	f, pos = read_varint(data, pos)
+	vecs, pos = read_block(data, pos, f*m)
+	factors = []
+	for i in range(f):
+		e, pos = read_varint(data, pos)
+		factors.append(vecs[i*m:(i + 1)*m] + [e])
+	return {
+		"variables": varbs if flags & 8 else None,
+		"numerator": [
+			exps[i*n:(i + 1)*n] + [join_number(nums[i], dens[i])]
+			for i in range(t)
+		],
+		"coefficient": join_number(c, c_den),
+		"monomial": mono,
+		"factors": factors,
+		"type": br_type,
+		"increasing_order": bool(flags & 1),
+		"hide_monomial": bool(flags & 2),
+		"factor": bool(flags & 4),
+	}
@@ -0,0 +1,102 @@
+#
+#   Copyright 2024--2025 Joshua Maglione
+#
+#   Distributed under MIT License
+#
+
+# Series expansions of rational functions whose denominators are products of
+# factors (1 - X^a). This module does not depend on SageMath.
+#
+# Multiplying by 1/(1 - t^a) is the recurrence c[i] += c[i - a], which is a
+# cumulative sum over the residue classes modulo a. Coefficients are kept in
+# int64 arrays as long as a bound on their size allows it and in arrays of
+# Python integers afterwards.
+
+import numpy
+
+INT64_MAX = 2**63 - 1
+
+# Given an array A of length L with entries bounded in absolute value by bound,
+# a positive integer a, and a positive integer e, return the pair of the first L
+# coefficients of A/(1 - t^a)^e and a bound on their absolute values.
+def divide_by_geometric(A, a:int, e:int, bound:int) -> tuple:
+	L = len(A)
+	rows = -(-L // a)
+	for _ in range(e):
+		if A.dtype != object and bound*rows > INT64_MAX:
+			A = A.astype(object)
+		if rows*a != L:
+			A = numpy.concatenate([A, numpy.zeros(rows*a - L, dtype=A.dtype)])
+		A = A.reshape(rows, a).cumsum(axis=0).reshape(-1)[:L]
+		if A.dtype != object:
+			bound = int(numpy.abs(A).max())
+	return (A, bound)
+
+# Given a dictionary of exponents and integer coefficients of a univariate
+# polynomial, a dictionary of the factors {a: e} of the denominator
+# prod (1 - t^a)^e, and a positive integer n, return the list of the
+# coefficients of t^0, ..., t^(n-1) of their quotient as Python integers.
+def univariate_series(numer:dict, factors:dict, n:int) -> list:
+	bound = max([abs(c) for c in numer.values()], default=0)
+	A = numpy.zeros(n, dtype=numpy.int64 if bound <= INT64_MAX else object)
+	for k, c in numer.items():
+		if k < n:
+			A[k] = c
+	for a, e in sorted(factors.items()):
+		if a < n:
+			A, bound = divide_by_geometric(A, a, e, bound)
+	return A.tolist()
+
+# Given a list of upper bounds for each variable and a bound on the total
+# degree, return the array of all exponent vectors in the region, one per row,
+# in lexicographic order.
+def region_points(upper:list, total:int):
+	X = numpy.zeros((1, 0), dtype=numpy.int64)
+	sums = numpy.zeros(1, dtype=numpy.int64)
+	for u in reversed(upper):
+		blocks = []
+		block_sums = []
+		for a in range(min(u, total) + 1):
+			keep = sums <= total - a
+			Y = X[keep]
+			blocks.append(numpy.hstack([numpy.full((len(Y), 1), a), Y]))
+			block_sums.append(sums[keep] + a)
+		X = numpy.vstack(blocks)
+		sums = numpy.concatenate(block_sums)
+	return X
+
+# Given a dictionary of exponent tuples and integer coefficients of a
+# polynomial, a dictionary of the factors {v: e} of the denominator
+# prod (1 - X^v)^e, where each v is non-zero with non-negative entries, a list
+# of upper bounds for each variable, and a bound on the total degree, return
+# the pair of the array of exponent vectors in the region and the array of the
+# coefficients of their quotient.
+def multivariate_series(numer:dict, factors:dict, upper:list, total:int) -> tuple:
+	X = region_points(upper, total)
+	weights = numpy.ones(len(upper), dtype=numpy.int64)
+	for i in range(len(upper) - 2, -1, -1):
+		weights[i] = weights[i + 1]*(upper[i + 1] + 1)
+	K = X @ weights
+	bound = max([abs(c) for c in numer.values()], default=0)
+	A = numpy.zeros(len(X), dtype=numpy.int64 if bound <= INT64_MAX else object)
+	for k, c in numer.items():
+		if all(a <= u for a, u in zip(k, upper)) and sum(k) <= total:
+			A[numpy.searchsorted(K, numpy.dot(k, weights))] = c
+	for v, e in sorted(factors.items()):
+		v = numpy.array(v, dtype=numpy.int64)
+		# Multiplying by 1/(1 - X^v) is the cumulative sum along v. It is done
+		# by adding the array shifted by v, 2v, 4v, ... in turn.
+		shifts = []
+		s = v
+		while all(s <= upper) and s.sum() <= total:
+			dst = numpy.flatnonzero((X >= s).all(axis=1))
+			shifts.append((dst, numpy.searchsorted(K, K[dst] - s @ weights)))
+			s = 2*s
+		for _ in range(e if shifts else 0):
+			for dst, src in shifts:
+				if A.dtype != object and 2*bound > INT64_MAX:
+					A = A.astype(object)
+				A[dst] += A[src]
+				if A.dtype != object:
+					bound = int(numpy.abs(A).max())
+	return (X, A)
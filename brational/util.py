@@ -7,6 +7,7 @@
 from enum import Enum
 from datetime import datetime
 from functools import reduce
+from collections import OrderedDict
 import re
 
 DEBUG = False
@@ -30,6 +31,19 @@ def parenthesis_wrap(expr:str) -> str:
             return f"({expr})"
     return expr
 
+# Given an associative binary function and a non-empty list, reduce the list
+# with the function. If balanced is True, the list is reduced pairwise, as in a
+# balanced binary tree, which keeps intermediate values of similar size.
+def tree_reduce(func, L:list, balanced:bool=False):
+    if not balanced:
+        return reduce(func, L)
+    while len(L) > 1:
+        pairs = [func(L[i], L[i + 1]) for i in range(0, len(L) - 1, 2)]
+        if len(L) % 2 == 1:
+            pairs.append(L[-1])
+        L = pairs
+    return L[0]
+
 # The length of the function name is unnecessarily long.
 def remove_unnecessary_braces_and_spaces(latex_text):
 	patt_braces = re.compile(r'[\^\_]\{.\}')
@@ -46,6 +60,56 @@ def remove_unnecessary_braces_and_spaces(latex_text):
 	]
 	return reduce(lambda x, y: y[0].sub(y[1], x), pairs, latex_text)
 
+class LRUCache:
+    r"""A size-bounded cache that discards the least recently used entries first.
+
+    - ``maxsize``: the maximum number of entries (default: ``4096``).
+    """
+
+    def __init__(self, maxsize:int=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def cached(self, key, func):
+        r"""Returns the value stored for ``key``. If there is none, the value is computed by calling ``func`` and stored."""
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+        self.misses += 1
+        value = func()
+        if self.maxsize > 0:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        r"""Removes all entries and resets the hit and miss counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, maxsize:int) -> None:
+        r"""Sets the maximum number of entries, discarding the least recently used entries if necessary."""
+        self.maxsize = maxsize
+        while len(self._data) > max(maxsize, 0):
+            self._data.popitem(last=False)
+
+    def info(self) -> dict:
+        r"""Returns a dictionary with the number of hits, misses, entries, and the maximum number of entries."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
 class brat_type(Enum):      
     #                           p.d. = positive degree 
     #                           n.d. = non-negative degree
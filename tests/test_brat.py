@@ -1,9 +1,14 @@
 import sys
 import os
-from sage.all import ZZ, QQ, polygens, var, polygen
+import json
+import pickle
+import tempfile
+import numpy
+from sage.all import ZZ, QQ, polygens, var, polygen, prod, LaurentSeriesRing, PowerSeriesRing
 
 sys.path.append(os.getcwd())
-from brational import brat
+from brational import brat, factor_cache, disk_cache, set_disk_cache, get_disk_cache
+from brational import write_archive, open_archive
 
 
 def test_integers():
@@ -287,11 +292,606 @@ def test_CICO():
 	# TESTS
 	assert C1 == (q**-8*t**3 - q**-9*t**5 - 4*q**-6*t**2 + q**-5*t + 4*q**-7*t**4 - 2*q**-6*t**3 + 3*q**-5*t**2 + 2*q**-6*t**4 - 10*q**-5*t**3 + 10*q**-4*t**2 - 2*q**-3*t - 3*q**-4*t**3 + 2*q**-3*t**2 - 4*q**-2*t - q**-4*t**4 + 4*q**-3*t**3 + 1 - q**-1*t**2)/((1 - q**-2*t)*(1 - q**-1*t)*(1 - t)**3*(1 - q*t))
 	assert str(brat(C1)) == "(q^-8*t^3 - q^-9*t^5 - 4*q^-6*t^2 + q^-5*t + 4*q^-7*t^4 - 2*q^-6*t^3 + 3*q^-5*t^2 + 2*q^-6*t^4 - 10*q^-5*t^3 + 10*q^-4*t^2 - 2*q^-3*t - 3*q^-4*t^3 + 2*q^-3*t^2 - 4*q^-2*t - q^-4*t^4 + 4*q^-3*t^3 + 1 - q^-1*t^2)/((1 - q^-2*t)*(1 - q^-1*t)*(1 - t)^3*(1 - q*t))"
-	assert str(brat(C2)) == "-(q^-9*t^4 - 2*q^-9*t^5 - q^-8*t^4 - q^-7*t^3 - 5*q^-6*t^2 + q^-5*t + q^-11*t^8 - 13*q^-9*t^6 + 6*q^-8*t^5 + 7*q^-7*t^4 + 7*q^-6*t^3 + 18*q^-5*t^2 - q^-4*t + q^-12*t^10 - q^-11*t^9 - 19*q^-10*t^8 + 69*q^-9*t^7 - 18*q^-8*t^6 + 7*q^-7*t^5 + 27*q^-6*t^4 - 89*q^-5*t^3 + q^-4*t^2 - 10*q^-3*t + q^-12*t^11 - 13*q^-11*t^10 - 2*q^-10*t^9 + 143*q^-9*t^8 - 309*q^-8*t^7 + 80*q^-7*t^6 + 49*q^-6*t^5 - 181*q^-5*t^4 + 243*q^-4*t^3 - 44*q^-3*t^2 + 22*q^-2*t + 7*q^-12*t^12 - 31*q^-11*t^11 + 145*q^-10*t^10 - 301*q^-9*t^9 - 29*q^-8*t^8 + 427*q^-7*t^7 - 123*q^-6*t^6 + 109*q^-5*t^5 + 42*q^-4*t^4 - 145*q^-3*t^3 - 7*q^-2*t^2 - 5*q^-1*t - 1 + 3*q^-12*t^13 - 92*q^-11*t^12 + 353*q^-10*t^11 - 876*q^-9*t^10 + 1481*q^-8*t^9 - 498*q^-7*t^8 - 896*q^-6*t^7 + 940*q^-5*t^6 - 945*q^-4*t^5 + 465*q^-3*t^4 - 67*q^-2*t^3 + 34*q^-1*t^2 - t + 7*q^-12*t^14 - 45*q^-11*t^13 + 395*q^-10*t^12 - 1065*q^-9*t^11 + 1675*q^-8*t^10 - 1996*q^-7*t^9 + 1996*q^-5*t^7 - 1675*q^-4*t^6 + 1065*q^-3*t^5 - 395*q^-2*t^4 + 45*q^-1*t^3 - 7*t^2 + q^-12*t^15 - 34*q^-11*t^14 + 67*q^-10*t^13 - 465*q^-9*t^12 + 945*q^-8*t^11 - 940*q^-7*t^10 + 896*q^-6*t^9 + 498*q^-5*t^8 - 1481*q^-4*t^7 + 876*q^-3*t^6 - 353*q^-2*t^5 + 92*q^-1*t^4 - 3*t^3 + q^-12*t^16 + 5*q^-11*t^15 + 7*q^-10*t^14 + 145*q^-9*t^13 - 42*q^-8*t^12 - 109*q^-7*t^11 + 123*q^-6*t^10 - 427*q^-5*t^9 + 29*q^-4*t^8 + 301*q^-3*t^7 - 145*q^-2*t^6 + 31*q^-1*t^5 - 7*t^4 - 22*q^-10*t^15 + 44*q^-9*t^14 - 243*q^-8*t^13 + 181*q^-7*t^12 - 49*q^-6*t^11 - 80*q^-5*t^10 + 309*q^-4*t^9 - 143*q^-3*t^8 + 2*q^-2*t^7 + 13*q^-1*t^6 - t^5 + 10*q^-9*t^15 - q^-8*t^14 + 89*q^-7*t^13 - 27*q^-6*t^12 - 7*q^-5*t^11 + 18*q^-4*t^10 - 69*q^-3*t^9 + 19*q^-2*t^8 + q^-1*t^7 - t^6 + q^-8*t^15 - 18*q^-7*t^14 - 7*q^-6*t^13 - 7*q^-5*t^12 - 6*q^-4*t^11 + 13*q^-3*t^10 - q^-1*t^8 - q^-7*t^15 + 5*q^-6*t^14 + q^-5*t^13 + q^-4*t^12 + 2*q^-3*t^11 - q^-3*t^12)/((1 - q^-2*t^2)*(1 - q^-1*t)^3*(1 - t)^4*(1 - t^2)^4)"
+	assert str(brat(C2)) == "-(q^-9*t^4 - 2*q^-9*t^5 - q^-8*t^4 - q^-7*t^3 - 5*q^-6*t^2 + q^-5*t + q^-11*t^8 - 13*q^-9*t^6 + 6*q^-8*t^5 + 7*q^-7*t^4 + 7*q^-6*t^3 + 18*q^-5*t^2 - q^-4*t + q^-12*t^10 - q^-11*t^9 - 19*q^-10*t^8 + 69*q^-9*t^7 - 18*q^-8*t^6 + 7*q^-7*t^5 + 27*q^-6*t^4 - 89*q^-5*t^3 + q^-4*t^2 - 10*q^-3*t + q^-12*t^11 - 13*q^-11*t^10 - 2*q^-10*t^9 + 143*q^-9*t^8 - 309*q^-8*t^7 + 80*q^-7*t^6 + 49*q^-6*t^5 - 181*q^-5*t^4 + 243*q^-4*t^3 - 44*q^-3*t^2 + 22*q^-2*t + 7*q^-12*t^12 - 31*q^-11*t^11 + 145*q^-10*t^10 - 301*q^-9*t^9 - 29*q^-8*t^8 + 427*q^-7*t^7 - 123*q^-6*t^6 + 109*q^-5*t^5 + 42*q^-4*t^4 - 145*q^-3*t^3 - 7*q^-2*t^2 - 5*q^-1*t - 1 + 3*q^-12*t^13 - 92*q^-11*t^12 + 353*q^-10*t^11 - 876*q^-9*t^10 + 1481*q^-8*t^9 - 498*q^-7*t^8 - 896*q^-6*t^7 + 940*q^-5*t^6 - 945*q^-4*t^5 + 465*q^-3*t^4 - 67*q^-2*t^3 + 34*q^-1*t^2 - t + 7*q^-12*t^14 - 45*q^-11*t^13 + 395*q^-10*t^12 - 1065*q^-9*t^11 + 1675*q^-8*t^10 - 1996*q^-7*t^9 + 1996*q^-5*t^7 - 1675*q^-4*t^6 + 1065*q^-3*t^5 - 395*q^-2*t^4 + 45*q^-1*t^3 - 7*t^2 + q^-12*t^15 - 34*q^-11*t^14 + 67*q^-10*t^13 - 465*q^-9*t^12 + 945*q^-8*t^11 - 940*q^-7*t^10 + 896*q^-6*t^9 + 498*q^-5*t^8 - 1481*q^-4*t^7 + 876*q^-3*t^6 - 353*q^-2*t^5 + 92*q^-1*t^4 - 3*t^3 + q^-12*t^16 + 5*q^-11*t^15 + 7*q^-10*t^14 + 145*q^-9*t^13 - 42*q^-8*t^12 - 109*q^-7*t^11 + 123*q^-6*t^10 - 427*q^-5*t^9 + 29*q^-4*t^8 + 301*q^-3*t^7 - 145*q^-2*t^6 + 31*q^-1*t^5 - 7*t^4 - 22*q^-10*t^15 + 44*q^-9*t^14 - 243*q^-8*t^13 + 181*q^-7*t^12 - 49*q^-6*t^11 - 80*q^-5*t^10 + 309*q^-4*t^9 - 143*q^-3*t^8 + 2*q^-2*t^7 + 13*q^-1*t^6 - t^5 + 10*q^-9*t^15 - q^-8*t^14 + 89*q^-7*t^13 - 27*q^-6*t^12 - 7*q^-5*t^11 + 18*q^-4*t^10 - 69*q^-3*t^9 + 19*q^-2*t^8 + q^-1*t^7 - t^6 + q^-8*t^15 - 18*q^-7*t^14 - 7*q^-6*t^13 - 7*q^-5*t^12 - 6*q^-4*t^11 + 13*q^-3*t^10 - q^-1*t^8 - q^-7*t^15 + 5*q^-6*t^14 + q^-5*t^13 + q^-4*t^12 + 2*q^-3*t^11 - q^-3*t^12)/((1 - q^-1*t)^3*(1 - q^-2*t^2)*(1 - t)^4*(1 - t^2)^4)"
 	assert C2 == -(q**-9*t**4 - 2*q**-9*t**5 - q**-8*t**4 - q**-7*t**3 - 5*q**-6*t**2 + q**-5*t + q**-11*t**8 - 13*q**-9*t**6 + 6*q**-8*t**5 + 7*q**-7*t**4 + 7*q**-6*t**3 + 18*q**-5*t**2 - q**-4*t + q**-12*t**10 - q**-11*t**9 - 19*q**-10*t**8 + 69*q**-9*t**7 - 18*q**-8*t**6 + 7*q**-7*t**5 + 27*q**-6*t**4 - 89*q**-5*t**3 + q**-4*t**2 - 10*q**-3*t + q**-12*t**11 - 13*q**-11*t**10 - 2*q**-10*t**9 + 143*q**-9*t**8 - 309*q**-8*t**7 + 80*q**-7*t**6 + 49*q**-6*t**5 - 181*q**-5*t**4 + 243*q**-4*t**3 - 44*q**-3*t**2 + 22*q**-2*t + 7*q**-12*t**12 - 31*q**-11*t**11 + 145*q**-10*t**10 - 301*q**-9*t**9 - 29*q**-8*t**8 + 427*q**-7*t**7 - 123*q**-6*t**6 + 109*q**-5*t**5 + 42*q**-4*t**4 - 145*q**-3*t**3 - 7*q**-2*t**2 - 5*q**-1*t - 1 + 3*q**-12*t**13 - 92*q**-11*t**12 + 353*q**-10*t**11 - 876*q**-9*t**10 + 1481*q**-8*t**9 - 498*q**-7*t**8 - 896*q**-6*t**7 + 940*q**-5*t**6 - 945*q**-4*t**5 + 465*q**-3*t**4 - 67*q**-2*t**3 + 34*q**-1*t**2 - t + 7*q**-12*t**14 - 45*q**-11*t**13 + 395*q**-10*t**12 - 1065*q**-9*t**11 + 1675*q**-8*t**10 - 1996*q**-7*t**9 + 1996*q**-5*t**7 - 1675*q**-4*t**6 + 1065*q**-3*t**5 - 395*q**-2*t**4 + 45*q**-1*t**3 - 7*t**2 + q**-12*t**15 - 34*q**-11*t**14 + 67*q**-10*t**13 - 465*q**-9*t**12 + 945*q**-8*t**11 - 940*q**-7*t**10 + 896*q**-6*t**9 + 498*q**-5*t**8 - 1481*q**-4*t**7 + 876*q**-3*t**6 - 353*q**-2*t**5 + 92*q**-1*t**4 - 3*t**3 + q**-12*t**16 + 5*q**-11*t**15 + 7*q**-10*t**14 + 145*q**-9*t**13 - 42*q**-8*t**12 - 109*q**-7*t**11 + 123*q**-6*t**10 - 427*q**-5*t**9 + 29*q**-4*t**8 + 301*q**-3*t**7 - 145*q**-2*t**6 + 31*q**-1*t**5 - 7*t**4 - 22*q**-10*t**15 + 44*q**-9*t**14 - 243*q**-8*t**13 + 181*q**-7*t**12 - 49*q**-6*t**11 - 80*q**-5*t**10 + 309*q**-4*t**9 - 143*q**-3*t**8 + 2*q**-2*t**7 + 13*q**-1*t**6 - t**5 + 10*q**-9*t**15 - q**-8*t**14 + 89*q**-7*t**13 - 27*q**-6*t**12 - 7*q**-5*t**11 + 18*q**-4*t**10 - 69*q**-3*t**9 + 19*q**-2*t**8 + q**-1*t**7 - t**6 + q**-8*t**15 - 18*q**-7*t**14 - 7*q**-6*t**13 - 7*q**-5*t**12 - 6*q**-4*t**11 + 13*q**-3*t**10 - q**-1*t**8 - q**-7*t**15 + 5*q**-6*t**14 + q**-5*t**13 + q**-4*t**12 + 2*q**-3*t**11 - q**-3*t**12)/((1 - q**-2*t**2)*(1 - q**-1*t)**3*(1 - t)**4*(1 - t**2)**4)
 	assert str(brat(C3, increasing_order=False)) == "(1 + 6*q^-4*t^2 + 20*q^-4*t - 14*q^-5*t^2 - 56*q^-5*t + 7*q^-6*t^2 + 49*q^-6*t + 15*q^-8*t^3 - 15*q^-7*t - 49*q^-9*t^3 - 7*q^-9*t^2 + 56*q^-10*t^3 + 14*q^-10*t^2 - 20*q^-11*t^3 - 6*q^-11*t^2 - q^-15*t^4)/((1 - q^-4*t)*(1 - q^-4*t^2)*(1 - t)^2)"
 	assert C3 == (1 + 6*q**-4*t**2 + 20*q**-4*t - 14*q**-5*t**2 - 56*q**-5*t + 7*q**-6*t**2 + 49*q**-6*t + 15*q**-8*t**3 - 15*q**-7*t - 49*q**-9*t**3 - 7*q**-9*t**2 + 56*q**-10*t**3 + 14*q**-10*t**2 - 20*q**-11*t**3 - 6*q**-11*t**2 - q**-15*t**4)/((1 - q**-4*t)*(1 - q**-4*t**2)*(1 - t)**2)
 
+def test_arithmetic():
+	x = polygen(QQ, 'x')
+	E = brat(numerator=1 + 26*x + 66*x**2 + 26*x**3 + x**4, denominator=(1 - x)**5)
+	F = brat(1/((1 - x)*(1 - x**2)))
+	assert str(E*F) == "(1 + 26*x + 66*x^2 + 26*x^3 + x^4)/((1 - x)^6*(1 - x^2))"
+	assert (E*F).rational_function() == E.rational_function()*F.rational_function()
+	assert str(F**3) == "1/((1 - x)^3*(1 - x^2)^3)"
+	assert str(F**0) == "1"
+	assert str(F/brat(x**3)) == "x^-3/((1 - x)*(1 - x^2))"
+	assert str(brat(x**3)/F) == "x^3 - x^4 - x^5 + x^6"
+	assert str(brat(2*x)*brat(QQ(1/2))) == "x"
+	assert str(F/2) == "1/(2*(1 - x)*(1 - x^2))"
+	assert str(brat(QQ(3/4))*brat(QQ(2/3))) == "1/2"
+	q, t = var('q t')
+	A = brat(1/(1 - q**-1*t))
+	B = brat((q**3 - t)/(q**3*(1 - t)*(1 - q*t)))
+	assert str(A*A) == "1/(1 - q^-1*t)^2"
+	assert (A*B).rational_function() == A.rational_function()*B.rational_function()
+	assert (A/B).rational_function() == A.rational_function()/B.rational_function()
+	assert (A**-2).rational_function() == A.rational_function()**-2
+	C = brat(1/(1 - t))
+	assert str(A + A) == "2/(1 - q^-1*t)"
+	assert str(A - A) == "0"
+	assert (A + C).rational_function() == A.rational_function() + C.rational_function()
+	assert (A - B).rational_function() == A.rational_function() - B.rational_function()
+	assert str(F + 1) == "(2 - x - x^2 + x^3)/((1 - x)*(1 - x^2))"
+	assert str(F + brat(x**-2)) == "(x^-2 - x^-1 + x)/((1 - x)*(1 - x^2))"
+	assert str(brat(QQ(1/6)) + brat(QQ(1/3))) == "1/2"
+	# Results are not reduced: common factors are kept in the denominator.
+	G = brat(1 - x)*brat(1/(1 - x))
+	assert str(G) == "(1 - x)/(1 - x)"
+	assert G == 1
+	assert str(brat(G.rational_function())) == "1"
+	assert str(brat(1/(1 - x)) + brat(-x/(1 - x))) == "(1 - x)/(1 - x)"
+
+def test_sum_and_prod():
+	t = polygen(QQ, 't')
+	P = brat.prod(brat(1/(1 - t**i)) for i in range(1, 5))
+	assert str(P) == "1/((1 - t)*(1 - t^2)*(1 - t^3)*(1 - t^4))"
+	assert str(brat.prod([brat(1/(1 - t**i)) for i in range(1, 5)], balanced=True)) == str(P)
+	S = brat.sum(brat(t**i/(1 - t**i)) for i in range(1, 4))
+	assert str(S) == "(t + t^2 - t^3 - 2*t^4 - 2*t^5 + 3*t^6)/((1 - t)*(1 - t^2)*(1 - t^3))"
+	assert S.rational_function() == sum(t**i/(1 - t**i) for i in range(1, 4))
+	q, T = polygens(QQ, ('q', 'T'))
+	L = [brat(q**(i % 7)*T**i/((1 - q*T**(i % 5 + 1))*(1 - T**(i % 3 + 1)))) for i in range(40)]
+	assert brat.sum(L) == brat.sum(L, balanced=True)
+	assert str(brat.sum([])) == "0"
+	assert str(brat.prod([])) == "1"
+	assert str(brat.sum([1, QQ(1/2), brat(t)])) == "(3 + 2*t)/2"
+
+def test_binomial_denominators():
+	t = polygen(QQ, 't')
+	D = prod(1 - t**i for i in range(1, 21))
+	F = brat(numerator=1 + t, denominator=D)
+	assert F.denominator_signature()["factors"] == {(i,): 1 for i in range(1, 21)}
+	assert F.rational_function() == (1 + t)/D
+	assert str(brat(1/((1 - t)*(1 + t**2)))) == "(1 - t^2)/((1 - t)*(1 - t^4))"
+	q, T = polygens(QQ, ('q', 'T'))
+	G = brat(numerator=1 + q*T, denominator=(q - T)*(1 - q*T**2)**3*(1 - q**3*T**4))
+	assert G.denominator_signature() == {
+		"coefficient": 1,
+		"monomial": (1, 0),
+		"factors": {(-1, 1): 1, (1, 2): 3, (3, 4): 1},
+	}
+	assert str(G) == "(q^-1 + T)/((1 - q^-1*T)*(1 - q*T^2)^3*(1 - q^3*T^4))"
+	# Sage makes univariate denominators monic, so the lowest term can be -1.
+	for f in [1/(1 - t), 1/((1 - t)*(1 - t**2)*(1 - t**3)), (1 + t)/(1 - t**2)**3]:
+		factor_cache.clear()
+		assert brat(f).rational_function() == f
+		assert factor_cache.info()["misses"] == 0
+	x, y, z = polygens(QQ, 'x,y,z')
+	factor_cache.clear()
+	H = brat(numerator=1 + x, denominator=(1 - x*y)*(1 - y*z)*(1 - x*z)*(1 - x)**2*(1 - y))
+	assert factor_cache.info()["misses"] == 0
+	assert list(H.denominator_signature()["factors"]) == [
+		(0, 1, 0), (1, 0, 0), (0, 1, 1), (1, 0, 1), (1, 1, 0)
+	]
+	assert str(H) == "(1 + x)/((1 - y)*(1 - x)^2*(1 - y*z)*(1 - x*z)*(1 - x*y))"
+	K = brat(numerator=1 + x, denominator=[(1 - x*y, 1), (1 - x, 2), (1 - y, 1)])
+	assert list(K.denominator_signature()["factors"]) == [(0, 1, 0), (1, 0, 0), (1, 1, 0)]
+
+def test_factored_denominators():
+	t = var('t')
+	F = brat(numerator=1 + 2*t**2 + 4*t**4 + 4*t**6 + 2*t**8 + t**10, denominator=[1 - t**i for i in range(1, 6)])
+	assert str(F) == "(1 + 2*t^2 + 4*t^4 + 4*t^6 + 2*t^8 + t^10)/((1 - t)*(1 - t^2)*(1 - t^3)*(1 - t^4)*(1 - t^5))"
+	x = polygen(QQ, 'x')
+	G = brat(((1 + x)/(2*(1 - x)**2*(1 - x**3))).factor())
+	assert str(G) == "(1 + x)/(2*(1 - x)^2*(1 - x^3))"
+	H = brat(numerator=1 + x, denominator=[(1 - x, 3), 1 + x**2, 2, (1 - x**2, 1)])
+	assert str(H) == "(1 + x - x^2 - x^3)/(2*(1 - x)^3*(1 - x^2)*(1 - x^4))"
+	assert str(brat(numerator=1 + x, denominator=[(1 - x, 3), (1 - x**2, 1)], fix_denominator=False)) == "1/(1 - x)^4"
+	assert str(brat(numerator=3, denominator=[2, 3])) == "3/6"
+	q, T = polygens(QQ, ('q', 'T'))
+	assert str(brat(numerator=1, denominator=[q - T, 1 - q*T, (1 - T, 2)])) == "q^-1/((1 - q^-1*T)*(1 - T)^2*(1 - q*T))"
+	D = [1 - x**i for i in range(1, 31)]
+	assert str(brat(numerator=1, denominator=D)) == str(brat(numerator=1, denominator=prod(D)))
+
+def test_verification_modes():
+	q, t = polygens(QQ, ('q', 't'))
+	R = (q**4 + q**2*t**2 - q**3 - 2*q**2*t - q*t**2 + q**2 + t**2)*(q - 1)/((q**2 + q*t + t**2)*(q - t)**3)
+	S = "(1 + q^-2*t^2 - 2*q^-1 - 2*q^-2*t - 2*q^-3*t^2 + 2*q^-2 + 2*q^-3*t + 2*q^-4*t^2 - q^-3 - q^-5*t^2)/((1 - q^-1*t)^2*(1 - q^-3*t^3))"
+	assert str(brat(R, increasing_order=False)) == S
+	assert str(brat(R, increasing_order=False, verify="modular")) == S
+	assert str(brat(R, increasing_order=False, verify="off")) == S
+	try:
+		brat(R, verify="sometimes")
+		assert False
+	except ValueError:
+		pass
+
+def test_factor_cache():
+	q, t = polygens(QQ, ('q', 't'))
+	R = (1 + q)/((1 + q*t)**2*(1 - t))
+	factor_cache.clear()
+	S = str(brat(R))
+	misses = factor_cache.info()["misses"]
+	hits = factor_cache.info()["hits"]
+	assert misses > 0
+	assert str(brat(R)) == S
+	assert factor_cache.info()["misses"] == misses
+	assert factor_cache.info()["hits"] > hits
+	factor_cache.resize(1)
+	assert factor_cache.info()["size"] == 1
+	factor_cache.resize(4096)
+	factor_cache.clear()
+	assert factor_cache.info() == {"hits": 0, "misses": 0, "size": 0, "maxsize": 4096}
+
+
+def test_disk_cache():
+	x, y = polygens(QQ, ('x', 'y'))
+	q, t = var('q t')
+	E = [
+		(x + y)/((1 - x)*(1 - x*y)**2),
+		(q**3 - t)/(q**3*(1 - t)*(1 - q*t)),
+		QQ(3)/4,
+	]
+	S = [str(brat(e)) for e in E]
+	filename = os.path.join(tempfile.mkdtemp(), "brats.sqlite")
+	with disk_cache(filename) as C:
+		assert get_disk_cache() is C
+		assert [str(brat(e)) for e in E] == S
+		assert C.info()["misses"] == 3 and C.info()["size"] == 3
+	assert get_disk_cache() is None
+	C = set_disk_cache(filename)
+	F = [brat(e) for e in E]
+	set_disk_cache(None)
+	assert C.info()["hits"] == 3 and C.info()["misses"] == 0
+	assert [str(f) for f in F] == S
+	assert F[0] == brat(E[0])
+	assert str(F[0]**2) == str(brat(E[0])**2)
+	with C:
+		brat(E[0], verify="off")
+		assert C.info()["misses"] == 1
+		brat(E[0], verify="modular")
+		assert C.info()["misses"] == 2 and C.info()["size"] == 5
+		brat(E[0], verify="off")
+		assert C.info()["hits"] == 4
+	C.close()
+
+
+def test_lazy():
+	t = polygen(QQ, 't')
+	f = (1 + t)/((1 - t)*(1 - t**3))
+	D = [1 - t**i for i in range(1, 6)]
+	A = brat(f, lazy=True)
+	B = brat(numerator=1 + t, denominator=D, lazy=True)
+	assert A == brat(f)
+	assert A.rational_function() == f
+	C = A*B + 3 - B**2
+	assert "_ring" not in A.__dict__ and "_ring" not in C.__dict__
+	E = brat(f)*brat(numerator=1 + t, denominator=D) + 3 - brat(numerator=1 + t, denominator=D)**2
+	assert C == E
+	assert str(C) == str(E)
+	assert str(A) == "(1 + t)/((1 - t)*(1 - t^3))"
+	assert A.denominator_signature() == brat(f).denominator_signature()
+	assert str(A/B) == str(brat(f)/brat(numerator=1 + t, denominator=D))
+	q, T = var('q T')
+	W = brat((q**3 - T)/(q**3*(1 - T)*(1 - q*T)), lazy=True)
+	assert str(W.subs({q: 1})) == "1/(1 - T)"
+	assert "_ring" not in W.__dict__
+	S = brat(0)
+	for k in range(2000):
+		S = S + brat(1/(1 - t), lazy=True)
+	assert S == 2000/(1 - t)
+	S = brat(0)
+	for k in range(2000):
+		S = S + brat(1/(1 - t), lazy=True)
+	assert str(S) == "2000/(1 - t)"
+
+
+def test_cached_renderings():
+	t = polygen(QQ, 't')
+	F = brat(numerator=1 + 6*t + 11*t**2 + 6*t**3, denominator=(1 - t)**4)
+	assert str(F) == "(1 + 6*t + 11*t^2 + 6*t^3)/(1 - t)^4"
+	assert str(F) is str(F)
+	assert F.latex() == "\\dfrac{1 + 6t + 11t^2 + 6t^3}{(1 - t)^4}"
+	assert F.latex(factor=True) == "\\dfrac{(1 + t)(1 + 2t)(1 + 3t)}{(1 - t)^4}"
+	assert F.latex() == "\\dfrac{1 + 6t + 11t^2 + 6t^3}{(1 - t)^4}"
+	F.increasing_order = False
+	assert str(F) == "(6*t^3 + 11*t^2 + 6*t + 1)/(1 - t)^4"
+	F.increasing_order = True
+	assert str(F) == "(1 + 6*t + 11*t^2 + 6*t^3)/(1 - t)^4"
+	G = brat(numerator=1 + t, denominator_signature={"coefficient": 1, "monomial": (2,), "factors": {(1,): 1}})
+	assert str(G) == "(t^-2 + t^-1)/(1 - t)"
+	G.hide_monomial = False
+	assert str(G) == "(1 + t)/(t^2*(1 - t))"
+
+
+def test_rendering():
+	X1, X2, q = polygens(ZZ, 'X1,X2,q')
+	B = brat(
+		numerator=3 - 2*X1*q + X1**2*X2**11 - q**3, 
+		denominator_signature={
+			"coefficient": 2, 
+			"monomial": (1, 0, 2), 
+			"factors": {(1, 0, 0): 1, (-1, 0, 1): 2, (1, 1, 1): 1}
+		}
+	)
+	assert str(B) == "(3*X1^-1*q^-2 - 2*q^-1 - X1^-1*q + X1*X2^11*q^-2)/(2*(1 - X1^-1*q)^2*(1 - X1)*(1 - X1*X2*q))"
+	assert B.latex() == "\\dfrac{3X_1^{-1}q^{-2} - 2q^{-1} - X_1^{-1}q + X_1X_2^{11}q^{-2}}{2(1 - X_1^{-1}q)^2(1 - X_1)(1 - X_1X_2q)}"
+	B.hide_monomial = False
+	assert str(B) == "(3 - 2*X1*q - q^3 + X1^2*X2^11)/(2*X1*q^2*(1 - X1^-1*q)^2*(1 - X1)*(1 - X1*X2*q))"
+	assert B.latex() == "\\dfrac{3 - 2X_1q - q^3 + X_1^2X_2^{11}}{2X_1q^2(1 - X_1^{-1}q)^2(1 - X_1)(1 - X_1X_2q)}"
+	B.increasing_order = False
+	assert str(B) == "(X1^2*X2^11 - q^3 - 2*X1*q + 3)/(2*X1*q^2*(1 - X1^-1*q)^2*(1 - X1)*(1 - X1*X2*q))"
+
+
+class UnpicklableError(Exception):
+	def __init__(self, a, b):
+		super().__init__(a)
+
+
+class BadInput:
+	def numerator(self):
+		raise UnpicklableError("bad", None)
+
+	def denominator(self):
+		raise UnpicklableError("bad", None)
+
+
+def test_map():
+	t = polygen(QQ, 't')
+	X, Y = polygens(QQ, 'X,Y')
+	L = [
+		1/(1 - t),
+		(1 + t, 1 - t**2),
+		1/(1 - t - t**2),
+		{"numerator": 1 + t, "denominator": 1 - t**2, "fix_denominator": False},
+		(1 + X*Y)/((1 - X)*(1 - X*Y**2)),
+	]
+	for processes in [1, 2]:
+		B = brat.map(L, processes=processes)
+		assert [str(b) for b in B[:2]] == ["1/(1 - t)", "(1 + t)/(1 - t^2)"]
+		assert isinstance(B[2], ValueError)
+		assert str(B[3]) == "1/(1 - t)"
+		assert str(B[4]) == str(brat(L[4]))
+		assert B[4] == brat(L[4])
+		assert B[4]._type == brat(L[4])._type
+	B = brat.map(L[:2], processes=2, increasing_order=False)
+	assert str(B[1]) == "(t + 1)/(1 - t^2)"
+	B = brat.map([BadInput(), L[0], BadInput()], processes=2, chunksize=3)
+	assert str(B[1]) == "1/(1 - t)"
+	for i in [0, 2]:
+		assert isinstance(B[i], RuntimeError)
+		assert str(B[i]).startswith(f"Input {i} raised UnpicklableError(")
+
+
+def test_pickle():
+	x, y, z = polygens(ZZ, 'x,y,z')
+	q, t = var('q t')
+	L = [
+		brat(numerator=(1 + x - 3*y*z)**4, denominator=(1 - x)*(1 - y*z)**2, increasing_order=False),
+		brat((q**3 - t)/(q**3*(1 - t)*(1 - q*t)), hide_monomial=False),
+		brat(numerator=1 + x*y, denominator=(1 - x)**2).factor(),
+		brat((1 + x)/(1 - x*y), lazy=True),
+		brat(QQ(3)/4),
+		brat(ZZ(-2)),
+	]
+	M = pickle.loads(pickle.dumps(L))
+	for A, B in zip(L, M):
+		assert str(A) == str(B)
+		assert A.latex() == B.latex()
+		assert A._type == B._type
+		assert A.increasing_order == B.increasing_order
+		assert A.hide_monomial == B.hide_monomial
+		assert A == B
+
+
+def test_serialization():
+	t = polygen(QQ, 't')
+	F = brat((1 + t)/(1 - t**3))
+	assert F.to_dict() == {
+		"variables": ["t"],
+		"numerator": [[0, 1], [1, 1]],
+		"coefficient": 1,
+		"monomial": [0],
+		"factors": [[3, 1]],
+		"type": "rf",
+		"increasing_order": True,
+		"hide_monomial": True,
+		"factor": False,
+	}
+	assert F.to_bytes() == b"BRAT\x01\x0b\x02rf\x01\x01t\x02\x01\x00\x01\x02\x02\x02\x01\x01\x00\x01\x01\x03\x01"
+	x, y, z = polygens(ZZ, 'x,y,z')
+	q, T = var('q T')
+	L = [
+		F,
+		brat(numerator=10**30*(1 + x - 3*y*z)**4, denominator=(1 - x)*(1 - y*z)**2, increasing_order=False),
+		brat((q**3 - T)/(q**3*(1 - T)*(1 - q*T)), hide_monomial=False),
+		brat(numerator=1 + x*y, denominator=(1 - x)**2).factor(),
+		brat(numerator=x**300, denominator_signature={"coefficient": 7, "monomial": (0, 0, 1000), "factors": {(-1, 0, 1): 2}}),
+		brat(QQ(-3)/4),
+		brat(ZZ(0)),
+		brat(numerator=int(2), denominator_signature={"coefficient": 3, "monomial": (0, 0, 0), "factors": {}}),
+	]
+	for A in L:
+		B = brat.from_dict(json.loads(json.dumps(A.to_dict())))
+		C = brat.from_bytes(A.to_bytes())
+		assert str(A) == str(B) == str(C)
+		assert A._type == B._type == C._type
+		assert A.increasing_order == C.increasing_order
+		assert A.hide_monomial == C.hide_monomial
+		assert A == C
+	d = {"variables": None, "numerator": [[2]], "coefficient": 1, "monomial": [0, 0, 0], "factors": [], "type": "i"}
+	assert brat.from_bytes(brat.from_dict(d).to_bytes()).to_dict() == brat.from_dict(d).to_dict()
+	try:
+		brat.from_bytes(b"TARB")
+		assert False
+	except ValueError:
+		pass
+
+
+def test_archive():
+	x, y = polygens(ZZ, 'x,y')
+	t = polygen(QQ, 't')
+	L = {
+		f"F{k}": brat(numerator=1 + k*x*y, denominator=(1 - x)*(1 - y)**k)
+		for k in range(1, 6)
+	}
+	L["G"] = brat((1 + t)/(1 - t**3))
+	with tempfile.TemporaryDirectory() as tmp:
+		path = os.path.join(tmp, "brats.arc")
+		assert write_archive(path, L) == 6
+		with open_archive(path) as A:
+			assert len(A) == 6
+			assert list(A) == list(L)
+			assert "F3" in A and not "F6" in A
+			assert A["F3"] == L["F3"]
+			assert str(A["G"]) == str(L["G"])
+			assert A.get("F6") is None
+			assert A.get_bytes("F2") == L["F2"].to_bytes()
+			for k, B in A.items():
+				assert str(B) == str(L[k])
+		H = brat(numerator=int(2), denominator_signature={"coefficient": 3, "monomial": (0, 0, 0), "factors": {}})
+		write_archive(path, {"H": H})
+		with open_archive(path) as A:
+			assert A["H"].to_dict() == H.to_dict()
+		try:
+			write_archive(path, [("a", L["G"]), ("a", L["G"])])
+			assert False
+		except ValueError:
+			pass
+		try:
+			open_archive(path)
+			assert False
+		except ValueError:
+			pass
+		bad = os.path.join(tmp, "bad.arc")
+		for data in [b"not an archive", b""]:
+			with open(bad, "wb") as f:
+				f.write(data)
+			try:
+				open_archive(bad)
+				assert False
+			except ValueError:
+				pass
+
+
+def test_from_string():
+	x, y, z = polygens(ZZ, 'x,y,z')
+	t = polygen(QQ, 't')
+	q, T = var('q T')
+	L = [
+		brat(numerator=1 + x*y - 3*z, denominator=3*x**2*(1 - x)**2*(1 - x*y)*(1 - y*z**3)),
+		brat(numerator=-(1 + x)*(1 - y)**2, denominator=x*y*(1 - x**2*y)**3),
+		brat((q**3 - T)/(q**3*(1 - T)*(1 - q*T))),
+		brat((1 + t)/(t**2*(1 - t))),
+		brat(QQ(3)/4),
+		brat(ZZ(0)),
+	]
+	for F in L:
+		R = F._ring if F._ring != QQ else None
+		for hide in (True, False):
+			for fac in (False, True):
+				G = F.factor() if fac else F
+				G.hide_monomial = hide
+				A = brat.from_string(str(G), variables=R)
+				assert (A._n_poly, A._d_sig, A._type) == (F._n_poly, F._d_sig, F._type)
+				if R is not None:
+					B = brat.from_latex(G.latex(), variables=R)
+					assert (B._n_poly, B._d_sig) == (F._n_poly, F._d_sig)
+	F = brat.from_string("(1 + 4*q*t + q^2*t^2)/((1 - t)*(1 - q^2*t)^3)")
+	assert str(F.variables()) == "(q, t)"
+	assert F.denominator_signature()["factors"] == {(0, 1): 1, (2, 1): 3}
+	F = brat.from_latex("\\dfrac{1 + x_1x_2^{12}}{(1 - x_1)(1 - x_2)^2}")
+	assert str(F) == "(1 + x_1*x_2^12)/((1 - x_1)*(1 - x_2)^2)"
+	assert brat.from_string("(x - 1)/((1 + x)*(1 - x^2))") == brat((x - 1)/((1 + x)*(1 - x**2)))
+	assert str(brat.from_string("5/10")) == "5/10"
+	t = polygen(QQ, 't')
+	F = brat.from_string("3/(6*(1 - t))")
+	assert str(F) == "3/(6*(1 - t))" == str(brat(numerator=3, denominator=6*(1 - t)))
+	assert F.denominator_signature()["coefficient"] == 6
+	assert F == 1/(2*(1 - t))
+	assert str(brat.from_latex("\\dfrac{2 + 4t}{4(1 - t^2)}")) == "(2 + 4*t)/(4*(1 - t^2))"
+	for s in ["1/0", "(1 + t)/(0*(1 - t))"]:
+		try:
+			brat.from_string(s)
+			assert False
+		except ValueError:
+			pass
+	try:
+		brat.from_string("(1 + x)/(1 - y", variables=[x, y])
+		assert False
+	except ValueError:
+		pass
+	try:
+		brat.from_string("1/(1 - w)", variables=[x, y])
+		assert False
+	except ValueError:
+		pass
+
+
+def test_series():
+	t = polygen(QQ, 't')
+	F = brat(1/((1 - t)*(1 - t**2)*(1 - t**3)))
+	assert F.series(10).list() == [1, 1, 2, 3, 4, 5, 7, 8, 10, 12]
+	assert F.series(10**5).list()[-1] == 833366667
+	L = LaurentSeriesRing(QQ, 't')
+	for G in [
+		brat((1 + t)/(t**2*(1 - t)**3)),
+		brat((1 + 3*t)/(5*(1 - t**4)**2*(1 - t))),
+		brat(2 + t**2),
+		brat(1/prod(1 - t**i for i in range(1, 41))),
+	]:
+		R = G.rational_function()
+		assert G.series(200) == (L(R.numerator())/L(R.denominator())).add_bigoh(200)
+	P = PowerSeriesRing(QQ, 't')
+	for c in [QQ(3)/4, ZZ(-2), ZZ(0)]:
+		C = brat(c).series(6)
+		assert C == P(c, prec=6) and C.prec() == 6
+		assert brat(c).series(max_degree=2) == ({(): c} if c != 0 else {})
+	C = brat(numerator=1 + t, denominator=5).series(3)
+	assert C.list() == [QQ(1)/5, QQ(1)/5] and C.prec() == 3
+	S = brat(1/prod(1 - t**i for i in range(1, 41))).series(5000)
+	assert S.list()[-1] > 2**63
+	x, y = polygens(ZZ, 'x,y')
+	try:
+		brat(1/(1 - x*y)).series(10)
+		assert False
+	except ValueError:
+		pass
+	G = brat(1/((1 - x)*(1 - x*y)**2))
+	assert G.series(max_degree=3) == {(0, 0): 1, (1, 0): 1, (1, 1): 2, (2, 0): 1, (2, 1): 2, (3, 0): 1}
+	assert G.series(max_degree=4, bounds=[None, 1])[(3, 1)] == 2
+	try:
+		G.series(bounds=[None, 1])
+		assert False
+	except ValueError:
+		pass
+	q, T = polygens(QQ, 'q,T')
+	a, b, c = polygens(QQ, 'a,b,c')
+	for F, d, bounds in [
+		(brat((1 + x*y)/((1 - x)**2*(1 - y)*(1 - x*y**2))), 8, None),
+		(brat((q**3 - T)/(q**3*(1 - T)*(1 - q*T))), 7, None),
+		(brat((1 + a*b*c)/(3*(1 - a*b)*(1 - b*c)*(1 - a*c)*(1 - a*b*c)**2)), 7, [3, None, 2]),
+	]:
+		R = F.rational_function()
+		gens = R.parent().gens()
+		m = F.denominator_signature()["monomial"]
+		X = prod(g**e for g, e in zip(gens, m))
+		P = PowerSeriesRing(QQ, [str(g) for g in gens], default_prec=d + 10)
+		S = P(R.numerator())/P(R.denominator()//X)
+		expected = {}
+		for e, coeff in S.polynomial().dict().items():
+			e = tuple(i - j for i, j in zip(e, m))
+			if sum(e) <= d and all(k is None or i <= k for i, k in zip(e, bounds or [None]*len(e))):
+				expected[e] = coeff
+		assert F.series(max_degree=d, bounds=bounds) == expected
+
+
+def test_coefficient():
+	t = polygen(QQ, 't')
+	F = brat(1/((1 - t)*(1 - t**2)*(1 - t**3)))
+	assert F.coefficient(10) == 14
+	assert F.coefficient(10**12) == 83333333333833333333334
+	assert [brat(QQ(5)/3).coefficient(n) for n in range(-1, 3)] == [0, QQ(5)/3, 0, 0]
+	for G in [
+		brat((1 + t)/(t**2*(1 - t)**3)),
+		brat((1 + 3*t)/(5*(1 - t**4)**2*(1 - t))),
+		brat(-(1 + t**7 + t**30)/(t**3*(1 - t)*(1 - t**3))),
+		brat(1/prod(1 - t**i for i in range(1, 21))),
+	]:
+		S = G.series(200)
+		m = G.denominator_signature()["monomial"][0]
+		assert all(G.coefficient(k) == S[k] for k in range(-m - 2, 200))
+	x, y = polygens(ZZ, 'x,y')
+	try:
+		brat(1/(1 - x*y)).coefficient(3)
+		assert False
+	except ValueError:
+		pass
+
+
+def test_quasipolynomial():
+	t = polygen(QQ, 't')
+	F = brat(1/((1 - t)*(1 - t**2)))
+	Q = F.quasipolynomial()
+	assert Q.period == 2 and Q.degree() == 1
+	assert Q(10**20) == 50000000000000000001
+	assert F.quasipolynomial() is Q
+	assert [brat(ZZ(5)).quasipolynomial()(n) for n in range(-1, 3)] == [0, 5, 0, 0]
+	for G in [
+		brat((1 + t)/(t**2*(1 - t)**3)),
+		brat((1 + 3*t)/(5*(1 - t**4)**2*(1 - t))),
+		brat(2 + t**2),
+		brat(-(1 + t**7 + t**30)/(t**3*(1 - t)*(1 - t**3))),
+		brat(1/prod(1 - t**i for i in range(1, 8))),
+	]:
+		Q = G.quasipolynomial()
+		S = G.series(300)
+		m = G.denominator_signature()["monomial"][0]
+		assert all(Q(k) == S[k] for k in range(-m - 3, 300))
+		assert Q(10**9 + 7) == G.coefficient(10**9 + 7)
+
+
+def test_evaluate():
+	x, y = polygens(QQ, 'x,y')
+	F = brat((1 + x*y)/((1 - x)*(1 - y)))
+	assert F.evaluate([(QQ(1)/2, QQ(1)/3), (2, 3)]) == [QQ(7)/2, QQ(7)/2]
+	V = F.evaluate(numpy.array([[0.5, 0.25], [0.25, 0.25], [1.0, 0.5]]))
+	assert numpy.allclose(V[:2], [3.0, 17/9]) and numpy.isinf(V[2])
+	grid = numpy.stack(numpy.meshgrid(numpy.linspace(0, 0.5, 3), numpy.linspace(0, 0.5, 4)), axis=-1)
+	assert F.evaluate(grid).shape == (4, 3)
+	a, b, c = polygens(QQ, 'a,b,c')
+	t = polygen(QQ, 't')
+	for G in [
+		brat((1 + a*b*c - 3*a**2*c + 7*b**5)/(2*a*(1 - a*b)*(1 - b*c)**3*(1 - a*c))),
+		brat((1 + t**3 + 5*t**10)/(3*t**2*(1 - t)**2*(1 - t**7))),
+	]:
+		R = G.rational_function()
+		k = len(R.parent().gens())
+		P = numpy.random.default_rng(0).uniform(-0.9, 0.9, (20, k))
+		exact = [R(*[QQ(float(u)) for u in p]) for p in P]
+		assert numpy.allclose(G.evaluate(P), [float(v) for v in exact])
+		assert G.evaluate([[QQ(float(u)) for u in p] for p in P]) == exact
+	Z = brat((1 + t)/(1 - t**2)).evaluate(numpy.array([0.5, 2.0 + 1j]))
+	assert Z.dtype == complex and numpy.allclose(Z, [2, 1/(-1.0 - 1j)])
+
+
+def test_compile():
+	from fractions import Fraction
+	x, y = polygens(QQ, 'x,y')
+	F = brat((1 + x*y)/((1 - x)*(1 - y)))
+	f = F.compile(backend="python")
+	assert f(0.5, 0.25) == 3.0
+	assert f(1.0, 0.25) == float("inf")
+	assert f(Fraction(1, 2), Fraction(1, 3)) == Fraction(7, 2)
+	g = F.compile()
+	V = g(numpy.array([0.5, 1.0]), numpy.array([0.25, 0.25]))
+	assert V[0] == 3.0 and numpy.isinf(V[1])
+	a, b, c = polygens(QQ, 'a,b,c')
+	t = polygen(QQ, 't')
+	for G in [
+		brat((1 + a*b*c - 3*a**2*c + 7*b**5)/(2*a*(1 - a*b)*(1 - b*c)**3*(1 - a*c))),
+		brat(numerator=1 + a, denominator_signature={"coefficient": 2, "monomial": (0, 1, 0), "factors": {(-1, 1, 0): 1, (0, 0, 1): 2}}),
+		brat((1 + t**3 + 5*t**400)/(3*t**2*(1 - t)**2*(1 - t**7))),
+	]:
+		gens = G.variables()
+		k = len(gens)
+		P = numpy.random.default_rng(0).uniform(-0.9, 0.9, (100, k))
+		expected = G.evaluate(P)
+		for order in [None, list(reversed(gens))]:
+			f = G.compile(order=order)
+			assert numpy.allclose(f(*[P[:, i] for i in range(k)]), expected)
+			f = G.compile(backend="python", order=order)
+			assert numpy.allclose([f(*p) for p in P], expected)
+		p = [Fraction(i + 1, 7) for i in range(k)]
+		assert QQ(f(*p)) == G.evaluate([[QQ(u) for u in p]])[0]
+	assert brat(QQ(3)/4).compile(backend="python")() == 0.75
+	try:
+		F.compile(backend="C")
+		assert False
+	except ValueError:
+		pass
+
 
 def main():
 	test_integers()
@@ -304,6 +904,26 @@ def main():
 	test_previous_reported_bugs()
 	test_Zeta_examples()
 	test_CICO()
+	test_arithmetic()
+	test_sum_and_prod()
+	test_binomial_denominators()
+	test_factored_denominators()
+	test_verification_modes()
+	test_factor_cache()
+	test_disk_cache()
+	test_lazy()
+	test_cached_renderings()
+	test_rendering()
+	test_map()
+	test_pickle()
+	test_serialization()
+	test_archive()
+	test_from_string()
+	test_series()
+	test_coefficient()
+	test_quasipolynomial()
+	test_evaluate()
+	test_compile()
 	print("All tests passed!")
 
 
@@ -1,5 +1,6 @@
 import sys
 import os
+from io import StringIO
 from sage.all import ZZ, QQ, polygens, var, polygen
 
 sys.path.append(os.getcwd())
@@ -263,6 +264,56 @@ def test_Zeta_examples():
 	assert brat(R12).latex() == "-(q^2 - 5q^3 + 8q^4 - 3q^5 - 2q^6)"
 	assert brat(R13).latex() == "\\dfrac{1 - qt^3}{(1 - t)(1 - t^2)(1 - qt)(1 - qt^2)}"
 
+def test_split_latex():
+	X = polygen(QQ, 'X')
+	Y1, Y2 = polygens(QQ, 'Y1,Y2')
+	assert brat((1 + X)**3).latex(split=True) == ("1 + 3X + 3X^2 + X^3", "1")
+	assert brat((1 + X**12)/5).latex(split=True) == ("1 + X^{12}", "5")
+	assert brat(ZZ(7)/3).latex(split=True) == ("7", "3")
+	F = brat(numerator=1 + Y1*Y2**10, denominator=(1 - Y1)*(1 - Y2**2)**11)
+	assert F.latex() == "\\dfrac{1 + Y_1Y_2^{10}}{(1 - Y_1)(1 - Y_2^2)^{11}}"
+	assert F.latex(split=True) == ("1 + Y_1Y_2^{10}", "(1 - Y_1)(1 - Y_2^2)^{11}")
+
+
+def test_write_latex_stream():
+	X = polygen(QQ, 'X')
+	f = brat((1 + X)**20)
+	out = StringIO()
+	f.write_latex(out, just_numerator=True, align=True, function_name="B_{20}(X)")
+	assert out.getvalue() == "\\begin{align*}\n\tB_{20}(X) &= 1 + 20X + 190X^2 + 1140X^3 + 4845X^4 + 15504X^5 + 38760X^6 + 77520X^7 + 125970X^8 \\\\ \n\t&\\quad + 167960X^9 + 184756X^{10} + 167960X^{11} + 125970X^{12} + 77520X^{13} + 38760X^{14} + 15504X^{15} \\\\ \n\t&\\quad + 4845X^{16} + 1140X^{17} + 190X^{18} + 20X^{19} + X^{20}\n\\end{align*}"
+	x, y = polygens(QQ, 'x,y')
+	g = brat(numerator=1 + x*y**2, denominator=1 - x**2*y**4)
+	out = StringIO()
+	g.write_latex(out, function_name="G")
+	assert out.getvalue() == "\\[\n\tG = \\dfrac{1 + xy^2}{1 - x^2y^4}\n\\]"
+	out = StringIO()
+	g.write_latex(out, just_denominator=True)
+	assert out.getvalue() == "\\[\n\t1 - x^2y^4\n\\]"
+
+
+def test_write_latex_many():
+	t = polygen(QQ, 't')
+	F = [brat(1/(1 - t**i)) for i in range(1, 4)]
+	out = StringIO()
+	brat.write_latex_many(F, out, names=[f"F_{i}" for i in range(1, 4)])
+	assert out.getvalue() == "\\[\n\tF_1 = \\dfrac{1}{1 - t}\n\\]\n\\[\n\tF_2 = \\dfrac{1}{1 - t^2}\n\\]\n\\[\n\tF_3 = \\dfrac{1}{1 - t^3}\n\\]"
+	X, q = polygens(QQ, 'X,q')
+	G = [brat(numerator=(1 + X*q - q**2)**k, denominator=[1 - X**i*q for i in range(1, k + 1)]) for k in range(1, 8)]
+	sequential = StringIO()
+	brat.write_latex_many(G, sequential, align=True, factor=True)
+	parallel = StringIO()
+	brat.write_latex_many(G, parallel, align=True, factor=True, processes=2)
+	single = []
+	for B in G:
+		out = StringIO()
+		B.write_latex(out, align=True, factor=True)
+		single.append(out.getvalue())
+	assert sequential.getvalue() == parallel.getvalue() == "\n".join(single)
+	try:
+		brat.write_latex_many(G, StringIO(), names=["G"])
+		assert False
+	except ValueError:
+		pass
 
 
 def main():
@@ -276,6 +327,9 @@ def main():
 	test_multivariate_rational_functions()
 	test_previous_reported_bugs()
 	test_Zeta_examples()
+	test_split_latex()
+	test_write_latex_stream()
+	test_write_latex_many()
 	print("All tests passed!")
 
 